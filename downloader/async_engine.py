@@ -0,0 +1,175 @@
+import asyncio
+import json
+import threading
+
+try:
+    import aiohttp
+except ImportError:  # silnik asyncio jest opcjonalny
+    aiohttp = None
+
+from downloader.fetch_pool import StreamedBody, rejected_by_api_header, STREAM_CHUNK
+from exceptions.exceptions import DownloadCancelledException
+
+ASYNCIO_AVAILABLE = aiohttp is not None
+
+MAX_IN_FLIGHT = 200        # globalny limit równoległych zapytań (wszystkie źródła)
+MAX_PER_HOST = 32          # limit połączeń do jednego hosta
+DEFAULT_TIMEOUT = 10
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+class AsyncResponse:
+    """Minimalny odpowiednik `requests.Response` używany przez downloadery."""
+
+    def __init__(self, status_code, headers, content, encoding=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncDownloadEngine:
+    """
+    Silnik pobierania oparty o asyncio.
+
+    Wszystkie zapytania (strony wyszukiwania i obrazy) wykonywane są jako
+    korutyny w jednej pętli zdarzeń, działającej w jednym wątku w tle.
+    Globalny semafor ogranicza liczbę zapytań w locie, więc setki pobrań
+    mogą trwać jednocześnie bez tworzenia wątku na każde zapytanie.
+
+    Metody `get` / `submit_*` są bezpieczne do wołania z dowolnego wątku.
+    """
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST, timeout=DEFAULT_TIMEOUT):
+        if aiohttp is None:
+            raise RuntimeError(
+                "Silnik asyncio wymaga pakietu 'aiohttp' (pip install aiohttp)."
+            )
+
+        self.max_in_flight = max_in_flight
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._open())
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _open(self):
+        # sesja i semafor muszą powstać wewnątrz pętli, w której będą używane
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self.max_in_flight,
+                limit_per_host=self.max_per_host,
+            ),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def _get(self, url, params=None, headers=None, timeout=None):
+        kwargs = {"params": params, "headers": headers}
+        if timeout:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+        async with self._semaphore:
+            async with self._session.get(url, **kwargs) as resp:
+                content = await resp.read()
+                return AsyncResponse(resp.status, resp.headers, content, resp.charset)
+
+    async def _fetch_body(
+        self, item, get_url, should_stop,
+        header_filter=None, get_api_header=None, filesize_filter=None, blob_cache=None,
+    ):
+        if should_stop and should_stop():
+            raise DownloadCancelledException()
+
+        rejected = rejected_by_api_header(item, get_api_header, header_filter)
+        if rejected is not None:
+            return rejected
+
+        url = get_url(item)
+        if not url:
+            raise ValueError("Brak adresu URL obrazu")
+
+        # magazyn obrazów czyta pliki i zapisuje SQLite – poza wątkiem pętli,
+        # żeby nie wstrzymywać pozostałych zapytań w locie
+        loop = asyncio.get_running_loop()
+        if blob_cache is not None:
+            cached = await loop.run_in_executor(None, blob_cache.get, url)
+            if cached is not None:
+                return cached
+
+        if header_filter is None and not filesize_filter:
+            response = await self._get(url)
+            if response.status_code != 200:
+                raise ValueError(f"HTTP {response.status_code}: {url}")
+            content = response.content
+        else:
+            async with self._semaphore:
+                async with self._session.get(url) as resp:
+                    if resp.status != 200:
+                        raise ValueError(f"HTTP {resp.status}: {url}")
+
+                    body = StreamedBody(header_filter, filesize_filter)
+                    rejected = body.check_length(
+                        resp.headers.get("Content-Length"),
+                        resp.headers.get("Content-Encoding"),
+                    )
+                    if rejected is not None:
+                        return rejected
+
+                    async for chunk in resp.content.iter_chunked(STREAM_CHUNK):
+                        rejected = body.feed(chunk)
+                        if rejected is not None:
+                            return rejected
+                    content = bytes(body.buffer)
+
+        if blob_cache is not None:
+            await loop.run_in_executor(None, blob_cache.put, url, content)
+        return content
+
+    def submit_get(self, url, params=None, headers=None, timeout=None):
+        """Zleca zapytanie GET; zwraca `concurrent.futures.Future` z AsyncResponse."""
+        return asyncio.run_coroutine_threadsafe(
+            self._get(url, params=params, headers=headers, timeout=timeout), self._loop
+        )
+
+    def submit_body(self, item, get_url, should_stop=None, **options):
+        """
+        Zleca pobranie obrazu; zwraca `concurrent.futures.Future` z bajtami
+        (albo z ImageHeader / SkippedBody, gdy obraz odrzucono przed pobraniem całości).
+        `options` jak w `fetch_pool.iter_page_bodies`.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._fetch_body(item, get_url, should_stop, **options),
+            self._loop,
+        )
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """Blokujące GET (dla wątku pobierania) wykonane w pętli silnika."""
+        return self.submit_get(url, params=params, headers=headers, timeout=timeout).result()
+
+
+def get_engine():
+    """Zwraca wspólny silnik asyncio (uruchamiany przy pierwszym użyciu)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncDownloadEngine()
+        return _engine
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from utils.utils import get_cache_dir
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024   # 2 GB pobranych obrazów
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class BlobCache:
+    """
+    Lokalny magazyn pobranych obrazów adresowany treścią.
+
+    Każdy plik zapisywany jest raz, pod nazwą skrótu SHA-256 treści
+    (<katalog>/ab/abcdef...), a indeks SQLite mapuje adres URL na skrót.
+    Ten sam obraz spod kilku adresów zajmuje więc miejsce tylko raz.
+    Po przekroczeniu `max_bytes` usuwane są najdawniej używane pliki (LRU).
+    """
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root or get_cache_dir("blobs")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.root, "index.sqlite"), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, digest TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER, last_used REAL)"
+        )
+        self._db.commit()
+        # łączny rozmiar plików liczony na bieżąco – bez SUM po całej tabeli przy każdym zapisie
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _blob_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def get(self, url):
+        """Zwraca zapisaną treść obrazu spod `url` albo None."""
+        with self._lock:
+            row = self._db.execute("SELECT digest FROM urls WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            digest = row[0]
+            self._db.execute(
+                "UPDATE blobs SET last_used = ? WHERE digest = ?", (time.time(), digest)
+            )
+            self._db.commit()
+
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except OSError:
+            # plik usunięty spoza aplikacji – zapominamy wpis
+            with self._lock:
+                self._db.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+                self._delete(digest)
+                self._db.commit()
+            return None
+
+    def put(self, url, content):
+        """Zapisuje treść obrazu pobranego spod `url`; zwraca jej skrót SHA-256."""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?)", (url, digest))
+            self._delete(digest)
+            self._db.execute(
+                "INSERT INTO blobs VALUES (?, ?, ?)", (digest, len(content), time.time())
+            )
+            self._total += len(content)
+            self._evict()
+            self._db.commit()
+        return digest
+
+    def _delete(self, digest):
+        row = self._db.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self._total -= row[0]
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+
+        for digest, size in self._db.execute(
+            "SELECT digest, size FROM blobs ORDER BY last_used"
+        ).fetchall():
+            self._db.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+            self._db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+            self._total -= size
+            if self._total <= self.max_bytes:
+                break
+
+    def purge(self):
+        """Usuwa wszystkie zapisane obrazy."""
+        with self._lock:
+            for (digest,) in self._db.execute("SELECT digest FROM blobs").fetchall():
+                try:
+                    os.remove(self._blob_path(digest))
+                except OSError:
+                    pass
+            self._db.execute("DELETE FROM urls")
+            self._db.execute("DELETE FROM blobs")
+            self._db.commit()
+            self._total = 0
+
+
+def get_blob_cache():
+    """Zwraca wspólny dla procesu magazyn pobranych obrazów."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = BlobCache()
+        return _cache
@@ -0,0 +1,271 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from downloader.http_session import http_get
+from validator.image_header import sniff_image_header
+from exceptions.exceptions import DownloadCancelledException
+
+DEFAULT_MAX_WORKERS = 8
+FETCH_TIMEOUT = 10
+PREFETCH_DEPTH = 1
+HEADER_SNIFF_LIMIT = 64 * 1024   # tyle bajtów czytamy, szukając nagłówka obrazu
+STREAM_CHUNK = 16 * 1024
+
+BACKEND_THREADS = "threads"
+BACKEND_ASYNCIO = "asyncio"
+
+
+class SkippedBody:
+    """
+    Treść obrazu odrzuconego przez filtr wagi pliku przed pobraniem całości
+    (na podstawie Content-Length albo po przekroczeniu max_mb w trakcie).
+    `len()` zwraca znany rozmiar w bajtach, więc blok filtru wagi
+    w downloaderze liczy odrzucenie tak samo jak dla pełnej treści.
+    """
+
+    def __init__(self, size):
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+
+class StreamedBody:
+    """
+    Zbiera kolejne fragmenty pobieranego obrazu i sprawdza je na bieżąco:
+    - rozmiar (Content-Length / liczba odebranych bajtów) względem filesize_filter,
+    - nagłówek pliku (format i wymiary) względem header_filter.
+    Gdy obraz i tak zostałby odrzucony, transfer można przerwać.
+    """
+
+    def __init__(self, header_filter=None, filesize_filter=None):
+        self.header_filter = header_filter
+        self.buffer = bytearray()
+        self.sniffing = header_filter is not None
+
+        filesize_filter = filesize_filter or {}
+        min_mb = filesize_filter.get("min_mb")
+        max_mb = filesize_filter.get("max_mb")
+        self.min_bytes = min_mb * 1024 * 1024 if min_mb is not None else None
+        self.max_bytes = max_mb * 1024 * 1024 if max_mb is not None else None
+
+    def check_length(self, content_length, content_encoding=None):
+        """
+        Sprawdza zadeklarowany rozmiar odpowiedzi; zwraca SkippedBody,
+        jeśli plik nie przejdzie filtru wagi. Dla treści kompresowanej
+        (Content-Encoding) nagłówek nie odpowiada rozmiarowi pliku – pomijamy.
+        """
+        if content_length is None or content_encoding:
+            return None
+        size = int(content_length)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return SkippedBody(size)
+        if self.min_bytes is not None and size < self.min_bytes:
+            return SkippedBody(size)
+        return None
+
+    def feed(self, chunk):
+        """Dodaje fragment; zwraca ImageHeader/SkippedBody, jeśli obraz należy odrzucić."""
+        self.buffer += chunk
+
+        if self.max_bytes is not None and len(self.buffer) > self.max_bytes:
+            return SkippedBody(len(self.buffer))
+
+        if not self.sniffing:
+            return None
+
+        header = sniff_image_header(bytes(self.buffer))
+        if header is not None or len(self.buffer) >= HEADER_SNIFF_LIMIT:
+            self.sniffing = False
+
+        if header is not None and self.header_filter(header):
+            return header
+        return None
+
+
+def rejected_by_api_header(item, get_api_header, header_filter):
+    """
+    Sprawdza wymiary podane przez API źródła, zanim obraz zostanie pobrany.
+    Zwraca ImageHeader, jeśli obraz i tak zostałby odrzucony.
+    """
+    if not (get_api_header and header_filter):
+        return None
+    try:
+        header = get_api_header(item)
+    except (KeyError, TypeError, ValueError):
+        return None
+    if header is not None and header_filter(header):
+        return header
+    return None
+
+
+def _fetch_body(
+    item, get_url, should_stop, header_filter=None, get_api_header=None, filesize_filter=None, blob_cache=None
+):
+    # anulowanie sprawdzamy jeszcze przed wysłaniem zapytania,
+    # żeby zadania czekające w kolejce nie generowały ruchu
+    if should_stop and should_stop():
+        raise DownloadCancelledException()
+
+    rejected = rejected_by_api_header(item, get_api_header, header_filter)
+    if rejected is not None:
+        return rejected
+
+    url = get_url(item)
+    if not url:
+        raise ValueError("Brak adresu URL obrazu")
+
+    if blob_cache is not None:
+        cached = blob_cache.get(url)
+        if cached is not None:
+            return cached
+
+    # tylko odpowiedź 200 jest obrazem – treść błędu (404, 429, 5xx) nie może trafić do magazynu
+    if header_filter is None and not filesize_filter:
+        response = http_get(url, timeout=FETCH_TIMEOUT)
+        if response.status_code != 200:
+            raise ValueError(f"HTTP {response.status_code}: {url}")
+        content = response.content
+    else:
+        # zamknięcie odpowiedzi przed końcem treści przerywa transfer
+        with http_get(url, timeout=FETCH_TIMEOUT, stream=True) as response:
+            if response.status_code != 200:
+                raise ValueError(f"HTTP {response.status_code}: {url}")
+            body = StreamedBody(header_filter, filesize_filter)
+
+            rejected = body.check_length(
+                response.headers.get("Content-Length"),
+                response.headers.get("Content-Encoding"),
+            )
+            if rejected is not None:
+                return rejected
+
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK):
+                rejected = body.feed(chunk)
+                if rejected is not None:
+                    return rejected
+            content = bytes(body.buffer)
+
+    if blob_cache is not None:
+        blob_cache.put(url, content)
+    return content
+
+
+def api_get(url, backend=BACKEND_THREADS, **kwargs):
+    """
+    Zapytanie do API wyszukiwania przez wybrany silnik pobierania.
+    Dla BACKEND_ASYNCIO zapytanie wykonuje się jako korutyna w pętli silnika.
+    """
+    if backend == BACKEND_ASYNCIO:
+        from downloader.async_engine import get_engine
+        return get_engine().get(url, **kwargs)
+    return http_get(url, **kwargs)
+
+
+def iter_search_pages(request_page, first_page, step=1, last_page=None, depth=PREFETCH_DEPTH):
+    """
+    Generator odpowiedzi API dla kolejnych stron wyników:
+    first_page, first_page + step, ... (najwyżej do last_page).
+
+    Zapytania o `depth` następnych stron są wysyłane z wyprzedzeniem,
+    więc gdy downloader przetwarza obrazy strony N, odpowiedź dla strony
+    N+1 jest już w drodze. depth=0 oznacza pobieranie stron sekwencyjnie.
+    Odpowiedzi zwracane są bez interpretacji – kody błędów (429 itp.)
+    obsługuje downloader w momencie sięgnięcia po daną stronę.
+    """
+    executor = ThreadPoolExecutor(max_workers=depth + 1)
+    pending = deque()
+    next_page = first_page
+
+    def fill(limit):
+        nonlocal next_page
+        while len(pending) < limit and (last_page is None or next_page <= last_page):
+            pending.append(executor.submit(request_page, next_page))
+            next_page += step
+
+    try:
+        fill(depth + 1)
+        while pending:
+            future = pending.popleft()
+            fill(depth)
+            yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_page_bodies(
+    items,
+    get_url,
+    max_workers=DEFAULT_MAX_WORKERS,
+    should_stop=None,
+    backend=BACKEND_THREADS,
+    header_filter=None,
+    get_api_header=None,
+    filesize_filter=None,
+    blob_cache=None,
+):
+    """
+    Pobiera równolegle treść wszystkich obrazów z jednej strony wyników API.
+
+    Zwraca pary (item, future) w kolejności wyników API, więc pętla
+    w downloaderze przetwarza obrazy (filtry, zapis, numeracja, progress)
+    dokładnie w tej samej kolejności co przy pobieraniu sekwencyjnym.
+    `future.result()` zwraca bajty obrazu albo rzuca wyjątek pobierania.
+
+    backend:
+        BACKEND_THREADS – ograniczona pula wątków (max_workers),
+        BACKEND_ASYNCIO – korutyny we wspólnym silniku asyncio
+                          (globalny limit równoległości, max_workers ignorowane).
+
+    header_filter (opcjonalny predykat ImageHeader -> bool) włącza wczesne
+    odrzucanie: obraz jest pobierany strumieniowo, a gdy nagłówek pliku
+    (lub wymiary z API, gdy podano get_api_header) wystarczą do odrzucenia,
+    transfer jest przerywany i future zwraca ImageHeader zamiast bajtów.
+
+    filesize_filter ({"min_mb", "max_mb"}) sprawdzany jest na podstawie
+    Content-Length, a przy jego braku – w trakcie pobierania; plik
+    odrzucony w ten sposób zwracany jest jako SkippedBody.
+
+    blob_cache (BlobCache) – przed pobraniem sprawdzany jest lokalny
+    magazyn obrazów, a każda pobrana w całości treść jest w nim zapisywana.
+
+    Przy przerwaniu pętli (wyjątek, anulowanie) zadania, które jeszcze
+    nie wystartowały, są anulowane.
+    """
+    items = list(items)
+    if not items:
+        return
+
+    options = dict(
+        header_filter=header_filter,
+        get_api_header=get_api_header,
+        filesize_filter=filesize_filter,
+        blob_cache=blob_cache,
+    )
+
+    if backend == BACKEND_ASYNCIO:
+        from downloader.async_engine import get_engine
+        engine = get_engine()
+        futures = [
+            engine.submit_body(item, get_url, should_stop, **options) for item in items
+        ]
+        try:
+            for item, future in zip(items, futures):
+                yield item, future
+        finally:
+            for future in futures:
+                future.cancel()
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))))
+    futures = [
+        executor.submit(_fetch_body, item, get_url, should_stop, **options) for item in items
+    ]
+
+    try:
+        for item, future in zip(items, futures):
+            yield item, future
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,125 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_CONNECTIONS = 10   # liczba hostów trzymanych w puli
+DEFAULT_POOL_MAXSIZE = 16       # maks. liczba połączeń keep-alive na host
+DEFAULT_TIMEOUT = 10            # sekundy, gdy wywołujący nie poda własnego
+
+_session = None
+_session_lock = threading.Lock()
+
+_stats = {"requests": 0, "opened": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _count("opened")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _count("opened")
+        return super()._new_conn()
+
+
+class _PooledAdapter(HTTPAdapter):
+    """
+    Adapter z pulą połączeń per host, domyślnym timeoutem
+    i licznikami otwartych / ponownie użytych połączeń.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, timeout=None, **kwargs):
+        _count("requests")
+        if timeout is None:
+            timeout = self.timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+def _build_session(pool_connections, pool_maxsize, timeout):
+    session = requests.Session()
+    adapter = _PooledAdapter(
+        timeout=timeout,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def configure_session(
+    pool_connections=DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize=DEFAULT_POOL_MAXSIZE,
+    timeout=DEFAULT_TIMEOUT,
+):
+    """
+    Tworzy (od nowa) wspólną sesję HTTP o podanych rozmiarach puli i timeoucie.
+    Stara sesja jest zamykana – jej połączenia keep-alive zostają zwolnione.
+    """
+    global _session
+    with _session_lock:
+        old = _session
+        _session = _build_session(pool_connections, pool_maxsize, timeout)
+    if old is not None:
+        old.close()
+    return _session
+
+
+def get_session():
+    """Zwraca wspólną dla całego procesu sesję HTTP (tworzoną leniwie)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session(
+                DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE, DEFAULT_TIMEOUT
+            )
+        return _session
+
+
+def http_get(url, **kwargs):
+    """Odpowiednik `requests.get` korzystający ze wspólnej puli połączeń."""
+    return get_session().get(url, **kwargs)
+
+
+def get_connection_stats():
+    """
+    Zwraca słownik:
+        requests – liczba wysłanych zapytań
+        opened   – liczba nowo otwartych połączeń TCP/TLS
+        reused   – liczba zapytań obsłużonych przez istniejące połączenie
+    """
+    with _stats_lock:
+        requests_count = _stats["requests"]
+        opened = _stats["opened"]
+    return {
+        "requests": requests_count,
+        "opened": opened,
+        "reused": max(0, requests_count - opened),
+    }
+
+
+def reset_connection_stats():
+    with _stats_lock:
+        _stats["requests"] = 0
+        _stats["opened"] = 0
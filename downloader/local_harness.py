@@ -0,0 +1,185 @@
+"""
+Sprawdzenie silników pobierania (threads / asyncio) na lokalnym serwerze
+udającym API źródeł – bez sieci i kluczy API.
+
+Użycie:
+    python -m downloader.local_harness [liczba_obrazów] [opóźnienie_ms]
+
+Serwer (http.server w wątku) udostępnia:
+    /search?page=N&per_page=K  – strona wyników JSON (id, url, width, height),
+    /img/<id>.jpg              – treść obrazu (co STRIDE_LARGE-ty plik jest duży),
+a każda odpowiedź obrazu jest opóźniana, żeby było widać równoległość.
+
+Dla każdego dostępnego silnika sprawdzane jest, że:
+    - wszystkie strony i obrazy wracają w kolejności wyników API,
+    - treść zgadza się bajt w bajt,
+    - duże pliki są odrzucane strumieniowo przez filtr wagi (SkippedBody),
+oraz mierzony jest czas i największa liczba zapytań obsługiwanych naraz.
+Kod wyjścia 1 oznacza niezgodność.
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from downloader.async_engine import ASYNCIO_AVAILABLE
+from downloader.fetch_pool import (
+    SkippedBody,
+    api_get,
+    iter_page_bodies,
+    iter_search_pages,
+    BACKEND_ASYNCIO,
+    BACKEND_THREADS,
+)
+
+PER_PAGE = 40
+STRIDE_LARGE = 10                   # co który obraz przekracza filtr wagi
+SMALL_SIZE = 20 * 1024
+LARGE_SIZE = 2 * 1024 * 1024
+FILESIZE_FILTER = {"min_mb": None, "max_mb": 1}
+
+
+def image_bytes(image_id):
+    size = LARGE_SIZE if image_id % STRIDE_LARGE == 0 else SMALL_SIZE
+    pattern = f"img{image_id}:".encode()
+    return (pattern * (size // len(pattern) + 1))[:size]
+
+
+class _StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, total, delay):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.total = total
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        try:
+            url = urlparse(self.path)
+            if url.path == "/search":
+                query = parse_qs(url.query)
+                page = int(query.get("page", ["1"])[0])
+                per_page = int(query.get("per_page", [str(PER_PAGE)])[0])
+                first = (page - 1) * per_page
+                ids = range(first, min(first + per_page, server.total))
+                results = [
+                    {"id": i, "url": f"{server.base_url}/img/{i}.jpg", "width": 640, "height": 480}
+                    for i in ids
+                ]
+                self._send(200, json.dumps({"results": results}).encode(), "application/json")
+            elif url.path.startswith("/img/"):
+                time.sleep(server.delay)
+                image_id = int(url.path[len("/img/"):].split(".")[0])
+                self._send(200, image_bytes(image_id), "image/jpeg")
+            else:
+                self._send(404, b"", "text/plain")
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+def run_backend(server, backend):
+    """Pobiera wszystkie strony i obrazy; zwraca (czas, liczba błędów)."""
+    pages_count = (server.total + PER_PAGE - 1) // PER_PAGE
+
+    def request_page(page):
+        return api_get(
+            f"{server.base_url}/search",
+            backend=backend,
+            params={"page": page, "per_page": PER_PAGE},
+            timeout=10,
+        )
+
+    errors = 0
+    expected_id = 0
+    server.peak = 0
+    start = time.perf_counter()
+
+    for response in iter_search_pages(request_page, 1, last_page=pages_count):
+        if response.status_code != 200:
+            print(f"  strona: HTTP {response.status_code}")
+            errors += 1
+            continue
+        items = response.json()["results"]
+        bodies = iter_page_bodies(
+            items,
+            lambda item: item["url"],
+            backend=backend,
+            filesize_filter=FILESIZE_FILTER,
+        )
+        for item, future in bodies:
+            if item["id"] != expected_id:
+                print(f"  kolejność: oczekiwano {expected_id}, jest {item['id']}")
+                errors += 1
+            expected_id = item["id"] + 1
+
+            body = future.result()
+            large = item["id"] % STRIDE_LARGE == 0
+            if large and not isinstance(body, SkippedBody):
+                print(f"  obraz {item['id']}: duży plik nie został odrzucony")
+                errors += 1
+            elif not large and body != image_bytes(item["id"]):
+                print(f"  obraz {item['id']}: treść się nie zgadza")
+                errors += 1
+
+    if expected_id != server.total:
+        print(f"  pobrano {expected_id} z {server.total} obrazów")
+        errors += 1
+    return time.perf_counter() - start, errors
+
+
+def run_harness(total=400, delay=0.05):
+    server = _StandInServer(total, delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    backends = [BACKEND_THREADS]
+    if ASYNCIO_AVAILABLE:
+        backends.append(BACKEND_ASYNCIO)
+    else:
+        print("aiohttp niedostępne – pomijam silnik asyncio.")
+
+    failed = False
+    try:
+        print(f"Obrazów: {total}, opóźnienie serwera: {delay * 1000:.0f} ms")
+        for backend in backends:
+            seconds, errors = run_backend(server, backend)
+            failed = failed or errors > 0
+            print(
+                f"{backend:<8} {seconds:7.2f} s  naraz (maks.): {server.peak:>4}  "
+                f"{'OK' if not errors else f'BŁĘDY: {errors}'}"
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+    return not failed
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    delay_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    sys.exit(0 if run_harness(count, delay_ms / 1000) else 1)
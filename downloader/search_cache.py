@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from utils.utils import get_cache_dir
+
+DEFAULT_TTL = 24 * 3600                 # sekundy
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024    # łączny rozmiar zapisanych odpowiedzi
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class CachedResponse:
+    """Odpowiedź API odczytana z pamięci podręcznej (interfejs jak `requests.Response`)."""
+
+    def __init__(self, content, status_code=200):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class SearchCache:
+    """
+    Trwała pamięć podręczna odpowiedzi API wyszukiwania (SQLite).
+
+    Klucz: (źródło, zapytanie, strona, rozmiar strony). Wpisy starsze niż
+    `ttl` są traktowane jak brak wpisu, a po przekroczeniu `max_bytes`
+    usuwane są najdawniej używane (LRU). Zapisywane są tylko odpowiedzi 200,
+    więc błędy i limity API nigdy nie trafiają do cache.
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(get_cache_dir(), "search_cache.sqlite")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " source TEXT,"
+            " content BLOB,"
+            " size INTEGER,"
+            " created REAL,"
+            " last_used REAL)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def _key(source, query, page, per_page):
+        return f"{source.lower()}|{query.strip().lower()}|{page}|{per_page}"
+
+    def get(self, source, query, page, per_page):
+        key = self._key(source, query, page, per_page)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            content, created = row
+            if now - created > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+
+            self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        return CachedResponse(content)
+
+    def put(self, source, query, page, per_page, content):
+        key = self._key(source, query, page, per_page)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, source.lower(), content, len(content), now, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self._db.execute(
+            "SELECT key, size FROM responses ORDER BY last_used"
+        ).fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def purge(self, source=None):
+        """Usuwa wszystkie wpisy (albo tylko wpisy danego źródła)."""
+        with self._lock:
+            if source is None:
+                self._db.execute("DELETE FROM responses")
+            else:
+                self._db.execute("DELETE FROM responses WHERE source = ?", (source.lower(),))
+            self._db.commit()
+
+
+def get_search_cache():
+    """Zwraca wspólną dla procesu pamięć podręczną wyników wyszukiwania."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache()
+        return _cache
+
+
+def with_search_cache(source, query, per_page, request_page, enabled=True):
+    """
+    Opakowuje funkcję `request_page(page)` downloadera tak, aby odpowiedzi
+    były najpierw szukane w pamięci podręcznej. enabled=False = pomiń cache.
+    """
+    if not enabled:
+        return request_page
+
+    cache = get_search_cache()
+
+    def cached_request(page):
+        cached = cache.get(source, query, page, per_page)
+        if cached is not None:
+            return cached
+
+        response = request_page(page)
+        if response.status_code == 200:
+            cache.put(source, query, page, per_page, response.content)
+        return response
+
+    return cached_request
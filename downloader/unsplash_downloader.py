@@ -1,9 +1,13 @@
 import os
-import requests
-from PIL import Image
-from io import BytesIO
 
-from validator.image_validator import is_valid_image
+from validator.image_validator import VALIDATION_BASIC
+from validator.dedup_index import get_dedup_index, DEFAULT_MAX_DISTANCE
+from validator.validation_rules import Candidate, ValidationChain
+from resizer.image_resizer import get_transform
+from validator.image_header import ImageHeader, make_header_filter
+from downloader.search_cache import with_search_cache
+from downloader.blob_cache import get_blob_cache
+from downloader.fetch_pool import iter_page_bodies, iter_search_pages, api_get, PREFETCH_DEPTH
 from downloader.unsplash_config import UNSPLASH_ACCESS_KEY
 from exceptions.exceptions import (
     RateLimitException,
@@ -17,24 +21,10 @@ from exceptions.exceptions import (
 MAX_FORMAT_ERRORS = 100
 MAX_RES_ERRORS = 100
 MAX_FILESIZE_ERRORS = 100
+MAX_WORKERS = 8
 SOURCE_NAME = "Unsplash"
 
 
-def _normalize_ext(fmt):
-    if not fmt:
-        return None, None
-
-    fmt = fmt.upper()
-    if fmt in ("JPEG", "JPG"):
-        return "jpg", "JPEG"
-    if fmt == "PNG":
-        return "png", "PNG"
-    if fmt == "GIF":
-        return "gif", "GIF"
-
-    return None, None
-
-
 def _ext_to_save_fmt(ext):
     ext = ext.lower()
     if ext in ("jpg", "jpeg"):
@@ -59,31 +49,75 @@ def download_images_unsplash(
     force_output_format=None,
     filesize_filter=None,
     should_stop=None,
+    max_workers=None,
+    backend="threads",
+    prefetch_depth=PREFETCH_DEPTH,
+    early_reject=True,
+    use_search_cache=True,
+    use_blob_cache=True,
+    dedup_max_distance=DEFAULT_MAX_DISTANCE,
+    validation_mode=VALIDATION_BASIC,
+    rule_order=None,
+    resize_to=None,
+    fast_resize=False,
 ):
 
     os.makedirs(save_dir, exist_ok=True)
+    dedup_index = get_dedup_index(save_dir, dedup_max_distance)
 
     downloaded = 0
     page = 1
 
-    format_errors = 0
-    res_errors = 0
-    filesize_errors = 0
+    per_page = min(10, count)
 
-    while downloaded < count:
-        if should_stop and should_stop():
-            raise DownloadCancelledException()
-
-        response = requests.get(
+    def request_page(page_no):
+        return api_get(
             "https://api.unsplash.com/search/photos",
             params={
                 "query": query,
                 "client_id": UNSPLASH_ACCESS_KEY,
-                "page": page,
-                "per_page": min(10, count - downloaded),
+                "page": page_no,
+                "per_page": per_page,
             },
+            backend=backend,
         )
 
+    request_page = with_search_cache(SOURCE_NAME, query, per_page, request_page, enabled=use_search_cache)
+    pages = iter_search_pages(request_page, page, depth=prefetch_depth)
+
+    # wczesne odrzucanie po nagłówku pliku / wymiarach z API (bez pobierania całości)
+    header_filter = (
+        make_header_filter(allowed_formats, resolution_filter, method, min_size)
+        if early_reject else None
+    )
+
+    # skalowanie/crop do rozmiaru docelowego jeszcze w pamięci, przed jedynym zapisem
+    save_transform = get_transform(resize_to, method, fast_resize) if resize_to else None
+
+    # filtry i walidacja jako łańcuch reguł (od najtańszych do najdroższych)
+    rules = ValidationChain(
+        SOURCE_NAME,
+        order=rule_order,
+        max_errors={
+            "filesize": MAX_FILESIZE_ERRORS,
+            "format": MAX_FORMAT_ERRORS,
+            "resolution": MAX_RES_ERRORS,
+        },
+        fail_fast=("resolution", "crop_size"),
+        allowed_formats=allowed_formats,
+        resolution_filter=resolution_filter,
+        crop_size=min_size if method == "crop" else None,
+        filesize_filter=filesize_filter,
+        validation_mode=validation_mode,
+        dedup_index=dedup_index,
+    )
+
+    while downloaded < count:
+        if should_stop and should_stop():
+            raise DownloadCancelledException()
+
+        response = next(pages)
+
         if response.status_code == 403 and "Rate Limit" in response.text:
             raise RateLimitException("Unsplash API limit exceeded")
 
@@ -97,125 +131,36 @@ def download_images_unsplash(
                 f"{SOURCE_NAME}: brak dalszych wyników. Pobrano {downloaded}/{count}."
             )
 
-        for item in results:
+        page_bodies = iter_page_bodies(
+            results,
+            lambda it: it["urls"]["regular"],
+            max_workers=max_workers or MAX_WORKERS,
+            should_stop=should_stop,
+            backend=backend,
+            header_filter=header_filter,
+            get_api_header=lambda it: ImageHeader(None, it["width"], it["height"], exact=False),
+            filesize_filter=filesize_filter if early_reject else None,
+            blob_cache=get_blob_cache() if use_blob_cache else None,
+        )
+
+        for item, body in page_bodies:
             if should_stop and should_stop():
                 raise DownloadCancelledException()
 
-            try:
-                url = item["urls"]["regular"]
-                raw = requests.get(url, timeout=10).content
-
-                # --- FILTR WAGI PLIKU (MB) ---
-                if filesize_filter:
-                    size_mb = len(raw) / (1024 * 1024)
-                    min_mb = filesize_filter.get("min_mb")
-                    max_mb = filesize_filter.get("max_mb")
-
-                    if min_mb is not None and size_mb < min_mb:
-                        filesize_errors += 1
-                        if downloaded > 0 and filesize_errors >= MAX_FILESIZE_ERRORS:
-                            raise SourceExhaustedException(
-                                f"{SOURCE_NAME}: wyczerpane przez filtr minimalnej wagi pliku."
-                            )
-                        if downloaded == 0 and filesize_errors >= MAX_FILESIZE_ERRORS:
-                            raise TooManyFilesizeFilteredException(
-                                f"{SOURCE_NAME}: zbyt restrykcyjny filtr minimalnej wagi pliku."
-                            )
-                        continue
-
-                    if max_mb is not None and size_mb > max_mb:
-                        filesize_errors += 1
-                        if downloaded > 0 and filesize_errors >= MAX_FILESIZE_ERRORS:
-                            raise SourceExhaustedException(
-                                f"{SOURCE_NAME}: wyczerpane przez filtr maksymalnej wagi pliku."
-                            )
-                        if downloaded == 0 and filesize_errors >= MAX_FILESIZE_ERRORS:
-                            raise TooManyFilesizeFilteredException(
-                                f"{SOURCE_NAME}: zbyt restrykcyjny filtr maksymalnej wagi pliku."
-                            )
-                        continue
-
-                img = Image.open(BytesIO(raw))
-
-                ext, _ = _normalize_ext(img.format)
-                if not ext:
-                    continue
-
-                # --- FORMAT FILTER ---
-                if allowed_formats and ext not in allowed_formats:
-                    format_errors += 1
-
-                    if downloaded > 0 and format_errors >= MAX_FORMAT_ERRORS:
-                        raise SourceExhaustedException(
-                            f"{SOURCE_NAME}: wyczerpane filtrem formatu."
-                        )
+            # strony mają stały rozmiar – nadmiarowe wyniki ostatniej strony pomijamy
+            if downloaded >= count:
+                break
 
-                    if downloaded == 0 and format_errors >= MAX_FORMAT_ERRORS:
-                        raise TooManyFormatFilteredException(
-                            f"{SOURCE_NAME}: zbyt restrykcyjne filtry formatu."
-                        )
-                    continue
-
-                # --- RESOLUTION FILTER ---
-                if resolution_filter:
-                    w, h = img.size
-
-                    def fail(msg):
-                        nonlocal res_errors
-                        res_errors += 1
-
-                        if downloaded > 0 and res_errors >= MAX_RES_ERRORS:
-                            raise SourceExhaustedException(
-                                f"{SOURCE_NAME}: wyczerpane ({msg})"
-                            )
-                        if downloaded == 0:
-                            raise TooManyResolutionFilteredException(
-                                f"{SOURCE_NAME}: zbyt restrykcyjny filtr ({msg})"
-                            )
-
-                    if resolution_filter.get("min_w") and w < resolution_filter["min_w"]:
-                        fail("za wąskie")
-                        continue
-                    if resolution_filter.get("min_h") and h < resolution_filter["min_h"]:
-                        fail("za niskie")
-                        continue
-                    if resolution_filter.get("max_w") and w > resolution_filter["max_w"]:
-                        fail("za szerokie")
-                        continue
-                    if resolution_filter.get("max_h") and h > resolution_filter["max_h"]:
-                        fail("za wysokie")
-                        continue
-
-                # --- CROP ---
-                if method == "crop" and min_size:
-                    mw, mh = min_size
-                    if img.width < mw or img.height < mh:
-                        res_errors += 1
-
-                        if downloaded > 0 and res_errors >= MAX_RES_ERRORS:
-                            raise SourceExhaustedException(
-                                f"{SOURCE_NAME}: wyczerpane (crop)"
-                            )
-
-                        if downloaded == 0:
-                            raise TooManyResolutionFilteredException(
-                                f"{SOURCE_NAME}: za małe do crop"
-                            )
-                        continue
-
-                if not is_valid_image(img):
+            try:
+                candidate = Candidate(body.result())
+                if rules.check(candidate, downloaded) is not None:
                     continue
 
-                final_ext = (force_output_format or ext).lower()
+                final_ext = (force_output_format or candidate.ext).lower()
+                filename = os.path.join(save_dir, f"{start_index + downloaded}.{final_ext}")
 
-                filename = os.path.join(
-                    save_dir, f"{start_index + downloaded}.{final_ext}"
-                )
-
-                if final_ext in ("jpg", "jpeg"):
-                    img = img.convert("RGB")
-
-                img.save(filename, _ext_to_save_fmt(final_ext))
+                candidate.decoded.save(filename, _ext_to_save_fmt(final_ext), transform=save_transform)
+                dedup_index.add(filename, candidate.image_hash, candidate.digest, SOURCE_NAME)
 
                 downloaded += 1
 
@@ -231,6 +176,4 @@ def download_images_unsplash(
             except Exception:
                 continue
 
-        page += 1
-
     return downloaded
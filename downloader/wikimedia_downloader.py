@@ -1,32 +1,58 @@
 import os
-import requests
-from PIL import Image
-from io import BytesIO
-from validator.image_validator import is_valid_image
+from validator.image_validator import VALIDATION_BASIC
+from validator.dedup_index import get_dedup_index, DEFAULT_MAX_DISTANCE
+from validator.validation_rules import Candidate, ValidationChain
+from resizer.image_resizer import get_transform
+from downloader.http_session import http_get
+from downloader.search_cache import with_search_cache
+from downloader.blob_cache import get_blob_cache
+from downloader.fetch_pool import iter_search_pages, PREFETCH_DEPTH
 from exceptions.exceptions import RateLimitException
 
 
-def download_images_wikimedia(query, count, save_dir, progress_callback=None, start_index=0):
+def download_images_wikimedia(query, count, save_dir, progress_callback=None, start_index=0,
+                              prefetch_depth=PREFETCH_DEPTH, use_search_cache=True, use_blob_cache=True,
+                              dedup_max_distance=DEFAULT_MAX_DISTANCE, validation_mode=VALIDATION_BASIC,
+                              resize_to=None, method="resize", fast_resize=False):
     os.makedirs(save_dir, exist_ok=True)
     downloaded = 0
     sroffset = 0
+    blob_cache = get_blob_cache() if use_blob_cache else None
+    dedup_index = get_dedup_index(save_dir, dedup_max_distance)
+
+    save_transform = get_transform(resize_to, method, fast_resize) if resize_to else None
+
+    # Wikimedia zapisuje każdy format jako JPG, więc bez reguł formatu i rozdzielczości
+    rules = ValidationChain(
+        "Wikimedia",
+        order=("exact_duplicate", "blank", "near_duplicate"),
+        validation_mode=validation_mode,
+        dedup_index=dedup_index,
+    )
 
     print(f"[Wikimedia] Start pobierania ({count} obrazów) dla zapytania: '{query}'")
 
-    while downloaded < count:
+    def request_page(offset):
         params = {
             "action": "query",
             "format": "json",
             "generator": "search",
             "gsrnamespace": 6,
-            "gsrlimit": min(10, count - downloaded),
-            "gsroffset": sroffset,
+            "gsrlimit": min(10, count),
+            "gsroffset": offset,
             "gsrsearch": query,
             "prop": "imageinfo",
             "iiprop": "url"
         }
+        return http_get("https://commons.wikimedia.org/w/api.php", params=params)
 
-        response = requests.get("https://commons.wikimedia.org/w/api.php", params=params)
+    request_page = with_search_cache("Wikimedia", query, min(10, count), request_page, enabled=use_search_cache)
+
+    # kolejna strona wyników jest pobierana w tle, gdy przetwarzamy bieżącą
+    result_pages = iter_search_pages(request_page, sroffset, step=10, depth=prefetch_depth)
+
+    while downloaded < count:
+        response = next(result_pages)
 
         if response.status_code == 429:
             raise RateLimitException("Wikimedia API limit exceeded")
@@ -50,28 +76,32 @@ def download_images_wikimedia(query, count, save_dir, progress_callback=None, st
                     print(f"[Wikimedia] Pominięto plik SVG: {img_url}")
                     continue
 
-                response = requests.get(img_url, timeout=10)
-                content_type = response.headers.get('Content-Type', '')
+                raw = blob_cache.get(img_url) if blob_cache else None
+                if raw is None:
+                    response = http_get(img_url, timeout=10)
+                    content_type = response.headers.get('Content-Type', '')
 
-                if "image" not in content_type:
-                    print(f"[Wikimedia] Pominięto – nieobrazowy content-type: {content_type}")
-                    continue
+                    if "image" not in content_type:
+                        print(f"[Wikimedia] Pominięto – nieobrazowy content-type: {content_type}")
+                        continue
 
-                try:
-                    img = Image.open(BytesIO(response.content))
-                except Exception as e:
-                    print(f"[Wikimedia] Błąd przy otwieraniu obrazu: {e}")
+                    raw = response.content
+                    if blob_cache:
+                        blob_cache.put(img_url, raw)
+
+                candidate = Candidate(raw)
+                rejection = rules.check(candidate, downloaded)
+                if rejection is not None:
+                    print(f"[Wikimedia] Odrzucony: {rejection}.")
                     continue
 
-                if is_valid_image(img):
-                    filename = os.path.join(save_dir, f"{downloaded + 1 + start_index}.jpg")
-                    img.convert("RGB").save(filename)
-                    downloaded += 1
-                    print(f"[Wikimedia] Zapisano: {filename}")
-                    if progress_callback:
-                        progress_callback(downloaded + start_index, count + start_index)
-                else:
-                    print("[Wikimedia] Odrzucony przez walidator.")
+                filename = os.path.join(save_dir, f"{downloaded + 1 + start_index}.jpg")
+                candidate.decoded.save(filename, "JPEG", transform=save_transform)
+                dedup_index.add(filename, candidate.image_hash, candidate.digest, "Wikimedia")
+                downloaded += 1
+                print(f"[Wikimedia] Zapisano: {filename}")
+                if progress_callback:
+                    progress_callback(downloaded + start_index, count + start_index)
             except Exception as e:
                 print(f"[Wikimedia] Błąd przy pobieraniu obrazu: {e}")
                 continue
@@ -79,7 +109,5 @@ def download_images_wikimedia(query, count, save_dir, progress_callback=None, st
             if downloaded >= count:
                 break
 
-        sroffset += 10
-
     print(f"[Wikimedia] Zakończono. Łącznie pobrano {downloaded}/{count} obrazów z Wikimedia.")
     return downloaded
@@ -0,0 +1,69 @@
+import math
+
+HIST_BINS = 8           # przedziałów na kanał RGB
+HIST_SAMPLE = (32, 32)  # histogram liczony na zmniejszonej miniaturze
+OUTLIER_Z = 2.5         # odstające: odległość od średniego histogramu > średnia + Z * odchylenie
+MIN_FOR_OUTLIERS = 10   # przy mniejszej liczbie obrazów statystyka nie ma sensu
+
+
+def color_histogram(img):
+    """Znormalizowany histogram kolorów (HIST_BINS na kanał, razem 3 * HIST_BINS liczb)."""
+    small = img.convert("RGB").resize(HIST_SAMPLE)
+    hist = small.histogram()
+    step = 256 // HIST_BINS
+    total = HIST_SAMPLE[0] * HIST_SAMPLE[1]
+    return [
+        sum(hist[channel * 256 + b * step: channel * 256 + (b + 1) * step]) / total
+        for channel in range(3)
+        for b in range(HIST_BINS)
+    ]
+
+
+def find_outliers(histograms, z=OUTLIER_Z):
+    """
+    Obrazy o kolorystyce nietypowej dla folderu: odległość L1 histogramu
+    od histogramu średniego większa niż średnia + z odchyleń standardowych.
+    Zwraca nazwy od najbardziej odstającej.
+    """
+    if len(histograms) < MIN_FOR_OUTLIERS:
+        return []
+
+    n = len(histograms)
+    dims = len(next(iter(histograms.values())))
+    mean = [0.0] * dims
+    for hist in histograms.values():
+        for i, v in enumerate(hist):
+            mean[i] += v / n
+
+    dist = {
+        name: sum(abs(v - m) for v, m in zip(hist, mean)) for name, hist in histograms.items()
+    }
+    mu = sum(dist.values()) / n
+    sd = math.sqrt(sum((d - mu) ** 2 for d in dist.values()) / n)
+    if sd == 0:
+        return []
+
+    limit = mu + z * sd
+    return sorted((name for name, d in dist.items() if d > limit), key=dist.get, reverse=True)
+
+
+def group_clusters(clusters):
+    """
+    Grupy (prawie) duplikatów z DedupIndex.clusters() (nazwa -> reprezentant):
+    lista list nazw, tylko grupy co najmniej dwuelementowe, największe najpierw.
+    """
+    groups = {}
+    for name, root in clusters.items():
+        groups.setdefault(root, []).append(name)
+    return sorted(
+        (sorted(names) for names in groups.values() if len(names) > 1),
+        key=lambda names: (-len(names), names[0]),
+    )
+
+
+def pick_best(names, info):
+    """
+    Najlepszy obraz grupy: największa rozdzielczość, potem większy plik.
+    info: nazwa -> (liczba pikseli, rozmiar pliku).
+    """
+    return max(names, key=lambda name: info.get(name, (0, 0)))
@@ -1,9 +1,71 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
+from gui.cleaner_analysis import color_histogram, find_outliers, group_clusters, pick_best
+from gui.thumbnail_cache import get_thumbnail_cache
+from resizer.image_resizer import prepare_draft, REDUCING_GAP
+from validator.dedup_index import get_dedup_index
+
+THUMB_SIZE = (200, 200)
+COLUMNS = 5
+CELL_PAD = 5
+CELL_W = THUMB_SIZE[0] + 2 * CELL_PAD + 4     # miniatura + odstęp + ramka zaznaczenia
+CELL_H = THUMB_SIZE[1] + 2 * CELL_PAD + 4
+GRID_MARGIN = 15
+
+BUFFER_ROWS = 2             # wiersze budowane ponad i pod widocznym obszarem
+THUMB_WORKERS = 4           # wątki dekodujące miniatury
+THUMB_MEMORY_LIMIT = 400    # miniatury trzymane w pamięci (LRU)
+POLL_MS = 30                # co ile wątek Tk odbiera gotowe miniatury
+ANALYSIS_REPORT_EVERY = 50  # co ile obrazów analiza raportuje postęp
+
+VIEW_ALL = "all"
+VIEW_CLUSTERS = "clusters"  # grupy (prawie) duplikatów, każda od nowego wiersza
+VIEW_OUTLIERS = "outliers"  # obrazy o nietypowej kolorystyce
+
+
+def load_thumbnail(path, size=THUMB_SIZE, cache=None):
+    """
+    Miniatura pliku jako obraz PIL (wywoływane w wątku roboczym).
+    Najpierw szukana w trwałej pamięci miniatur (`cache`); w przeciwnym
+    razie JPEG dekodowany jest od razu w zmniejszonej skali (draft),
+    a wynik zapisywany do pamięci.
+    """
+    if cache is not None:
+        try:
+            cached = cache.get(path, size)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            print(f"[Miniatury] Błąd odczytu pamięci miniatur: {e}")
+
+    with Image.open(path) as img:
+        prepare_draft(img, size)
+        img.thumbnail(size, reducing_gap=REDUCING_GAP)
+        if img.mode not in ("RGB", "RGBA", "L"):
+            img = img.convert("RGB")
+
+    if cache is not None:
+        try:
+            cache.put(path, size, img)
+        except Exception as e:
+            print(f"[Miniatury] Błąd zapisu pamięci miniatur: {e}")
+    return img
+
+
+def load_thumbnail_with_histogram(path, size=THUMB_SIZE, cache=None):
+    """Miniatura (jak load_thumbnail, z zapisem do pamięci miniatur) i jej histogram kolorów."""
+    img = load_thumbnail(path, size, cache)
+    return img, color_histogram(img)
+
+
 class CleanerWindow:
 
     def _on_mousewheel(self, event):
@@ -22,14 +84,37 @@ class CleanerWindow:
         self.on_close = on_close
         self.selected_files = set()
 
+        # model siatki: wszystkie pliki i aktualnie wyświetlana lista (None = pusta komórka);
+        # widżety istnieją tylko dla widocznych komórek
+        self.files = []
+        self.view = []
+        self.clusters = []          # listy nazw (prawie) duplikatów
+        self.outliers = []          # nazwy obrazów nietypowych
+        self._best = set()          # ścieżki najlepszych obrazów w grupach
+        self._image_info = {}       # nazwa -> (liczba pikseli, rozmiar pliku)
+        self._cells = {}            # indeks pliku -> (etykieta, id okna na canvasie)
+        self._free_cells = []       # etykiety do ponownego użycia
+        self._thumbs = OrderedDict()    # ścieżka -> PhotoImage (LRU)
+        self._pending = {}          # ścieżka -> Future dekodowania
+        self._events = queue.Queue()    # (rodzaj, dane) z wątków roboczych do wątku Tk
+        self._anchor = None         # indeks ostatnio klikniętego pliku (zakres Shift+klik)
+        self._deleting = False
+        self._close_pending = False     # zamknięcie krzyżykiem w trakcie usuwania
+        self._executor = ThreadPoolExecutor(max_workers=THUMB_WORKERS)
+        self._thumb_cache = get_thumbnail_cache()
+        self._closed = False
+
         self.window = tk.Toplevel()
         self.window.title("PRACA INŻYNIERSKA – ręczne czyszczenie obrazów")
         self.window.geometry("700x600")
         self.window.resizable(False, False)
         self.window.protocol("WM_DELETE_WINDOW", self._on_window_close)
+        # pusta komórka o rozmiarze miniatury, zanim ta zostanie zdekodowana
+        self._placeholder = tk.PhotoImage(master=self.window, width=THUMB_SIZE[0], height=THUMB_SIZE[1])
 
         BG = "#f5f5f5"
         CARD = "#ffffff"
+        self.card_color = CARD
 
         # ===== ROOT =====
         root_frame = tk.Frame(self.window, bg=BG)
@@ -48,30 +133,55 @@ class CleanerWindow:
 
         tk.Label(
             header,
-            text="Zaznacz obrazy do usunięcia i zatwierdź na dole",
+            text="Zaznacz obrazy do usunięcia i zatwierdź na dole\n"
+                 "Shift+klik – zakres, prawy klik – podobne, Ctrl+A – wszystkie, Esc – odznacz",
+            justify="left",
             font=("Segoe UI", 10),
             fg="#555",
             bg=BG
         ).pack(anchor="w", pady=(4, 0))
 
+        # ===== WIDOK =====
+        view_bar = tk.Frame(root_frame, bg=BG, padx=20)
+        view_bar.pack(fill="x", pady=(0, 8))
+
+        self.view_mode = tk.StringVar(value=VIEW_ALL)
+        self.view_buttons = {}
+        for mode, text in (
+            (VIEW_ALL, "Wszystkie"),
+            (VIEW_CLUSTERS, "Podobne grupy"),
+            (VIEW_OUTLIERS, "Nietypowe"),
+        ):
+            button = tk.Radiobutton(
+                view_bar, text=text, variable=self.view_mode, value=mode,
+                command=self._build_view, bg=BG,
+                state="normal" if mode == VIEW_ALL else "disabled",
+            )
+            button.pack(side="left")
+            self.view_buttons[mode] = button
+
+        self.keep_best_button = ttk.Button(
+            view_bar,
+            text="Zostaw najlepsze, usuń resztę",
+            command=self.keep_best,
+            state="disabled"
+        )
+        self.keep_best_button.pack(side="right")
+
         ttk.Separator(root_frame).pack(fill="x", padx=20, pady=(0, 10))
 
         # ===== CONTENT (SCROLL) =====
         content_frame = tk.Frame(root_frame, bg=BG)
         content_frame.pack(fill="both", expand=True, padx=20)
 
-        self.canvas = tk.Canvas(content_frame, bg=BG, highlightthickness=0)
+        self.canvas = tk.Canvas(
+            content_frame, bg=CARD, highlightthickness=0, yscrollincrement=CELL_H // 4
+        )
         self.scrollbar = ttk.Scrollbar(content_frame, orient="vertical", command=self.canvas.yview)
 
-        self.scroll_frame = tk.Frame(self.canvas, bg=CARD, padx=15, pady=15)
-
-        self.canvas.create_window((0, 0), window=self.scroll_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-
-        self.scroll_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
+        # każde przewinięcie (pasek, kółko) przechodzi przez _on_scroll
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.canvas.bind("<Configure>", lambda e: self._update_visible())
         self.canvas.bind("<Enter>", lambda e: self.canvas.bind_all("<MouseWheel>", self._on_mousewheel))
         self.canvas.bind("<Leave>", lambda e: self.canvas.unbind_all("<MouseWheel>"))
         self.canvas.pack(side="left", fill="both", expand=True)
@@ -83,59 +193,437 @@ class CleanerWindow:
 
         ttk.Separator(bottom).pack(fill="x", pady=(0, 12))
 
+        self.status_label = tk.Label(bottom, text="", font=("Segoe UI", 9), fg="#555", bg=BG)
+        self.status_label.pack(side="left")
+
+        ttk.Button(
+            bottom,
+            text="Zakończ czyszczenie",
+            command=self.finish
+        ).pack(side="right")
+
         self.delete_button = ttk.Button(
             bottom,
             text="Usuń zaznaczone obrazy",
             command=self.delete_selected
         )
-        self.delete_button.pack(anchor="e")
+        self.delete_button.pack(side="right", padx=(0, 8))
+
+        self.window.bind("<Control-a>", self.select_all)
+        self.window.bind("<Escape>", self.clear_selection)
 
         # ===== LOAD =====
         self.load_images()
+        self.window.after(POLL_MS, self._drain_events)
+        threading.Thread(target=self._analyze, args=(list(self.files),), daemon=True).start()
+
+    # ----------------------------
+    # MODEL I WIDOCZNY FRAGMENT SIATKI
+    # ----------------------------
 
     def load_images(self):
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
+        """
+        Wczytuje listę plików (bez otwierania obrazów), usuwa z pamięci
+        miniatur wpisy plików skasowanych i ustawia wysokość obszaru
+        przewijania. Widżety i miniatury powstają tylko dla widocznych
+        wierszy (plus BUFFER_ROWS) – patrz _update_visible.
+        """
+        self.files = sorted([f for f in os.listdir(self.folder_path) if f.lower().endswith((".jpg", ".png", ".jpeg", ".gif"))])
+        self._thumb_cache.prune(self.folder_path, self.files)
+        self._build_view()
+
+    def _build_view(self):
+        """Lista wyświetlanych komórek dla wybranego widoku."""
+        mode = self.view_mode.get()
+        if mode == VIEW_CLUSTERS:
+            view = []
+            for cluster in self.clusters:
+                view.extend(cluster)
+                view.extend([None] * (-len(cluster) % COLUMNS))
+        elif mode == VIEW_OUTLIERS:
+            view = list(self.outliers)
+        else:
+            view = list(self.files)
+        self.view = view
+        self._anchor = None
+        self.canvas.yview_moveto(0)
+        self._reflow()
+
+    def _reflow(self):
+        """Układa siatkę od nowa po zmianie listy plików – pracy tyle, ile widocznych komórek."""
+        for idx in list(self._cells):
+            self._release_cell(idx)
+
+        rows = (len(self.view) + COLUMNS - 1) // COLUMNS
+        self.canvas.configure(
+            scrollregion=(0, 0, COLUMNS * CELL_W + 2 * GRID_MARGIN, rows * CELL_H + 2 * GRID_MARGIN)
+        )
+        self._update_visible()
+        self._update_status()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._update_visible()
+
+    def _visible_range(self):
+        top = self.canvas.canvasy(0) - GRID_MARGIN
+        height = max(self.canvas.winfo_height(), CELL_H)
+        first_row = max(0, int(top // CELL_H) - BUFFER_ROWS)
+        last_row = int((top + height) // CELL_H) + BUFFER_ROWS
+        return first_row * COLUMNS, min(len(self.view), (last_row + 1) * COLUMNS)
+
+    def _update_visible(self):
+        if self._closed:
+            return
+        start, end = self._visible_range()
+
+        for idx in [i for i in self._cells if not start <= i < end]:
+            self._release_cell(idx)
+
+        wanted = set()
+        for idx in range(start, end):
+            if self.view[idx] is None:
+                continue
+            path = os.path.join(self.folder_path, self.view[idx])
+            wanted.add(path)
+            if idx not in self._cells:
+                self._bind_cell(idx, path)
+
+        # miniatury, które wyjechały poza bufor, nie są już potrzebne
+        for path in [p for p in self._pending if p not in wanted]:
+            if self._pending[path].cancel():
+                del self._pending[path]
+
+    def _bind_cell(self, idx, path):
+        if self._free_cells:
+            label, item = self._free_cells.pop()
+            self.canvas.itemconfigure(item, state="normal")
+        else:
+            label = tk.Label(self.canvas, image=self._placeholder, bd=2, relief="solid", bg=self.card_color)
+            label.bind("<Button-1>", partial(self._on_cell_click, label))
+            label.bind("<Shift-Button-1>", partial(self._on_cell_shift_click, label))
+            label.bind("<Button-3>", partial(self._on_cell_select_similar, label))
+            item = self.canvas.create_window(0, 0, window=label, anchor="nw")
+
+        row, col = divmod(idx, COLUMNS)
+        self.canvas.coords(item, GRID_MARGIN + col * CELL_W + CELL_PAD, GRID_MARGIN + row * CELL_H + CELL_PAD)
+        label.path = path
+        label.index = idx
+        self._cells[idx] = (label, item)
+
+        thumb = self._thumbs.get(path)
+        if thumb is not None:
+            self._thumbs.move_to_end(path)
+            label.config(image=thumb)
+        else:
+            label.config(image=self._placeholder)
+            self._request_thumbnail(path)
+        self._paint_selection(label)
+
+    def _release_cell(self, idx):
+        label, item = self._cells.pop(idx)
+        label.path = None
+        label.index = None
+        label.config(image=self._placeholder)
+        self.canvas.itemconfigure(item, state="hidden")
+        self._free_cells.append((label, item))
+
+    # ----------------------------
+    # MINIATURY (dekodowanie w tle)
+    # ----------------------------
 
-        files = sorted([f for f in os.listdir(self.folder_path) if f.lower().endswith((".jpg", ".png", ".jpeg", ".gif"))])
-        for idx, fname in enumerate(files):
-            path = os.path.join(self.folder_path, fname)
+    def _request_thumbnail(self, path):
+        if path in self._pending:
+            return
+        future = self._executor.submit(load_thumbnail, path, THUMB_SIZE, self._thumb_cache)
+        future.add_done_callback(partial(self._thumbnail_done, path))
+        self._pending[path] = future
+
+    def _thumbnail_done(self, path, future):
+        # wątek roboczy: tylko kolejka – obiekty Tk tworzy wątek GUI
+        if future.cancelled():
+            return
+        try:
+            self._events.put(("thumb", (path, future.result(), None)))
+        except Exception as e:
+            self._events.put(("thumb", (path, None, e)))
+
+    def _drain_events(self):
+        if self._closed:
+            return
+        while True:
             try:
-                img = Image.open(path)
-                img.thumbnail((200, 200))
-                tk_img = ImageTk.PhotoImage(img)
-                label = tk.Label(self.scroll_frame, image=tk_img, bd=2, relief="solid", highlightthickness=0)
-                label.image = tk_img
-                label.grid(row=idx // 5, column=idx % 5, padx=5, pady=5)
-                label.bind("<Button-1>", partial(self.toggle_select, path, label))
+                kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "thumb":
+                self._on_thumbnail(*payload)
+            elif kind == "deleted":
+                self._on_deleted(*payload)
+            elif kind == "similar":
+                self._select_paths(payload)
+            elif kind == "analysis_progress":
+                self._update_status("Analiza obrazów: {}/{}".format(*payload))
+            elif kind == "analysis":
+                self._on_analysis(*payload)
+        self.window.after(POLL_MS, self._drain_events)
+
+    def _on_thumbnail(self, path, img, error):
+        self._pending.pop(path, None)
+        if error is not None:
+            print(f"Nie można załadować {os.path.basename(path)}: {error}")
+            return
+
+        thumb = ImageTk.PhotoImage(img)
+        self._thumbs[path] = thumb
+        while len(self._thumbs) > THUMB_MEMORY_LIMIT:
+            self._thumbs.popitem(last=False)
+
+        for label, _ in self._cells.values():
+            if label.path == path:
+                label.config(image=thumb)
+                break
+
+    # ----------------------------
+    # ZAZNACZANIE I USUWANIE
+    # ----------------------------
+
+    def _paint_selection(self, label):
+        if label.path in self.selected_files:
+            label.config(highlightbackground="red", highlightthickness=2)
+        elif label.path in self._best and self.view_mode.get() == VIEW_CLUSTERS:
+            label.config(highlightbackground="green", highlightthickness=2)
+        else:
+            label.config(highlightbackground="white", highlightthickness=0)
+
+    def _on_cell_click(self, label, event=None):
+        if label.path is not None:
+            self.toggle_select(label.path, label)
+            self._anchor = label.index
+
+    def _on_cell_shift_click(self, label, event=None):
+        """Shift+klik: zakres od ostatnio klikniętego obrazu, w jego nowym stanie."""
+        if label.path is None:
+            return
+        if self._anchor is None or self._anchor >= len(self.view):
+            self._on_cell_click(label)
+            return
+
+        anchor_path = os.path.join(self.folder_path, self.view[self._anchor])
+        select = anchor_path in self.selected_files
+        lo, hi = sorted((self._anchor, label.index))
+        for name in self.view[lo:hi + 1]:
+            if name is None:
+                continue
+            path = os.path.join(self.folder_path, name)
+            if select:
+                self.selected_files.add(path)
+            else:
+                self.selected_files.discard(path)
+        self._repaint()
+
+    def _on_cell_select_similar(self, label, event=None):
+        """Prawy klik: zaznacza obrazy podobne (perceptual hash) – indeks liczony w tle."""
+        if label.path is None:
+            return
+        name = os.path.basename(label.path)
+        self.status_label.config(text="Szukam podobnych obrazów...")
+
+        def worker():
+            try:
+                similar = get_dedup_index(self.folder_path).similar(name)
             except Exception as e:
-                print(f"Nie można załadować {fname}: {e}")
+                print(f"[Czyszczenie] Nie można wyszukać podobnych: {e}")
+                similar = [name]
+            self._events.put(("similar", [os.path.join(self.folder_path, n) for n in similar]))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _select_paths(self, paths):
+        existing = {os.path.join(self.folder_path, name) for name in self.files}
+        self.selected_files.update(p for p in paths if p in existing)
+        self._repaint()
+
+    def select_all(self, event=None):
+        """Zaznacza wszystkie obrazy bieżącego widoku."""
+        self.selected_files = {os.path.join(self.folder_path, name) for name in self.view if name is not None}
+        self._repaint()
+
+    def clear_selection(self, event=None):
+        self.selected_files.clear()
+        self._repaint()
+
+    def _repaint(self):
+        for label, _ in self._cells.values():
+            self._paint_selection(label)
+        self._update_status()
+
+    def _update_status(self, message=None):
+        text = f"Obrazów: {len(self.files)}   zaznaczonych: {len(self.selected_files)}"
+        if message:
+            text = f"{message}   {text}"
+        self.status_label.config(text=text)
 
     def toggle_select(self, path, label, event=None):
         if path in self.selected_files:
             self.selected_files.remove(path)
-            label.config(highlightbackground="white", highlightthickness=0)
         else:
             self.selected_files.add(path)
-            label.config(highlightbackground="red", highlightthickness=2)
+        self._paint_selection(label)
+        self._update_status()
 
     def delete_selected(self):
-        deleted = 0
-        for f in list(self.selected_files):
+        """
+        Usuwa zaznaczone pliki w wątku roboczym; po zakończeniu siatka jest
+        tylko przeliczana (_on_deleted) – bez ponownego czytania folderu
+        i dekodowania pozostałych miniatur. Okno zostaje otwarte.
+        """
+        if self._deleting or not self.selected_files:
+            return
+        paths = sorted(self.selected_files)
+        self._deleting = True
+        self.delete_button.config(state="disabled")
+        self.status_label.config(text=f"Usuwanie {len(paths)} plików...")
+
+        def worker():
+            removed, errors = [], 0
+            for f in paths:
+                try:
+                    os.remove(f)
+                    removed.append(f)
+                except Exception as e:
+                    errors += 1
+                    print(f"Błąd usuwania {f}: {e}")
+            self._events.put(("deleted", (removed, errors)))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_deleted(self, removed, errors):
+        removed_names = {os.path.basename(path) for path in removed}
+        self.files = [name for name in self.files if name not in removed_names]
+        self.clusters = [
+            kept for kept in ([n for n in cluster if n not in removed_names] for cluster in self.clusters)
+            if len(kept) > 1
+        ]
+        self.outliers = [name for name in self.outliers if name not in removed_names]
+        self.selected_files -= set(removed)
+        for path in removed:
+            self._thumbs.pop(path, None)
+        self._deleting = False
+        if self._close_pending:
+            self._on_window_close()
+            return
+        self.delete_button.config(state="normal")
+        self._update_view_buttons()
+
+        message = f"Usunięto {len(removed)} plików."
+        if errors:
+            message += f" Błędy: {errors}."
+        # lista i grupy przeliczane są w pamięci – bez czytania folderu i dekodowania
+        top = self.canvas.yview()[0]
+        self._build_view()
+        self.canvas.yview_moveto(top)
+        self._update_status(message)
+
+    # ----------------------------
+    # ANALIZA: GRUPY DUPLIKATÓW I OBRAZY NIETYPOWE (w tle)
+    # ----------------------------
+
+    def _analyze(self, names):
+        """
+        Wątek roboczy: grupy (prawie) duplikatów z indeksu perceptual hash
+        folderu (hashowane są tylko pliki jeszcze niezindeksowane), wymiary
+        z nagłówków oraz histogramy kolorów miniatur wszystkich plików do
+        wykrywania obrazów nietypowych. Miniatury bez wpisu w trwałej pamięci
+        miniatur dekodowane są w zmniejszonej skali (draft) i zapisywane,
+        więc kolejne otwarcia folderu ich nie dekodują. Nietypowe obrazy
+        wyznaczane są raz, z kompletu histogramów; postęp i wyniki trafiają
+        do kolejki zdarzeń.
+        """
+        try:
+            clusters = group_clusters(get_dedup_index(self.folder_path).clusters())
+        except Exception as e:
+            print(f"[Czyszczenie] Nie można pogrupować duplikatów: {e}")
+            clusters = []
+
+        info, histograms = {}, {}
+        for i, name in enumerate(names, start=1):
+            if self._closed:
+                return
+            path = os.path.join(self.folder_path, name)
             try:
-                os.remove(f)
-                deleted += 1
+                with Image.open(path) as img:     # tylko nagłówek
+                    info[name] = (img.width * img.height, os.path.getsize(path))
+                _, histograms[name] = load_thumbnail_with_histogram(path, THUMB_SIZE, self._thumb_cache)
             except Exception as e:
-                print(f"Błąd usuwania {f}: {e}")
+                print(f"[Czyszczenie] Pomijam {name} w analizie: {e}")
+            if i % ANALYSIS_REPORT_EVERY == 0:
+                self._events.put(("analysis_progress", (i, len(names))))
 
-        self.selected_files.clear()
-        self.load_images()
+        self._events.put(("analysis", (clusters, find_outliers(histograms), info)))
 
-        tk.messagebox.showinfo("Czyszczenie zakończone", f"Usunięto {deleted} plików.")
+    def _on_analysis(self, clusters, outliers, info):
+        existing = set(self.files)
+        self.clusters = [
+            kept for kept in ([n for n in cluster if n in existing] for cluster in clusters)
+            if len(kept) > 1
+        ]
+        self.outliers = [name for name in outliers if name in existing]
+        self._image_info = info
+        self._update_view_buttons()
+        if self.view_mode.get() != VIEW_ALL:
+            self._build_view()
+        self._update_status(
+            f"Grupy podobnych: {len(self.clusters)}, nietypowe: {len(self.outliers)}."
+        )
 
+    def _update_view_buttons(self):
+        self._best = {
+            os.path.join(self.folder_path, pick_best(cluster, self._image_info)) for cluster in self.clusters
+        }
+        self.view_buttons[VIEW_CLUSTERS].config(
+            text=f"Podobne grupy ({len(self.clusters)})", state="normal" if self.clusters else "disabled"
+        )
+        self.view_buttons[VIEW_OUTLIERS].config(
+            text=f"Nietypowe ({len(self.outliers)})", state="normal" if self.outliers else "disabled"
+        )
+        self.keep_best_button.config(state="normal" if self.clusters else "disabled")
+        # widok, który właśnie opustoszał, wraca do wszystkich obrazów
+        if str(self.view_buttons[self.view_mode.get()].cget("state")) != "normal":
+            self.view_mode.set(VIEW_ALL)
+
+    def keep_best(self):
+        """W każdej grupie podobnych zostawia najlepszy obraz (rozdzielczość, rozmiar), resztę usuwa."""
+        if self._deleting or not self.clusters:
+            return
+        doomed = {
+            os.path.join(self.folder_path, name)
+            for cluster in self.clusters
+            for name in cluster
+            if os.path.join(self.folder_path, name) not in self._best
+        }
+        if not messagebox.askyesno(
+            "Zostaw najlepsze",
+            f"Z {len(self.clusters)} grup podobnych obrazów zostanie usuniętych {len(doomed)} plików.\n"
+            "Kontynuować?",
+            parent=self.window,
+        ):
+            return
+        self.selected_files = doomed
+        self._repaint()
+        self.delete_selected()
+
+    def finish(self):
+        """Kończy ręczne czyszczenie i przekazuje folder do dalszego przetwarzania."""
+        if self._deleting:
+            return
         if self.on_close:
             self.on_close(self.folder_path)
+        self._close()
 
+    def _close(self):
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
         self.window.destroy()
 
     def _on_window_close(self):
@@ -143,7 +631,12 @@ class CleanerWindow:
         Zamknięcie cleanera krzyżykiem:
         zachowuje się TAK SAMO jak zakończenie ręcznego czyszczenia
         """
+        if self._deleting:
+            # renumeracja folderu (on_close) nie może ruszyć, zanim wątek
+            # usuwający skończy – inaczej usunąłby pliki przemianowane na jego ścieżki
+            self._close_pending = True
+            self.status_label.config(text="Okno zamknie się po zakończeniu usuwania...")
+            return
         if self.on_close:
             self.on_close(None)
-        self.window.destroy()
-
+        self._close()
@@ -0,0 +1,73 @@
+import queue
+
+EVENT_PROGRESS = "progress"     # current, total – łączone: liczy się tylko najnowsze
+EVENT_REJECTED = "rejected"     # source, reason
+EVENT_ERROR = "error"           # title, message
+EVENT_FINISHED = "finished"     # reset_progress, title, message (opcjonalne)
+EVENT_CALL = "call"             # fn, args – dowolna funkcja do wykonania w wątku Tk
+
+DRAIN_INTERVAL_MS = 50          # ok. 20 odświeżeń na sekundę, niezależnie od tempa pobierania
+
+
+class EventBus:
+    """
+    Kolejka zdarzeń z wątków roboczych do wątku Tk.
+
+    Wątki robocze wywołują tylko post() / call() (bezpieczne z każdego
+    wątku) i nigdy nie dotykają widżetów. Wątek Tk co DRAIN_INTERVAL_MS
+    opróżnia kolejkę i przekazuje zdarzenia do funkcji zarejestrowanych
+    przez subscribe(), w kolejności nadania. Z kilku zdarzeń EVENT_PROGRESS
+    w jednej porcji obsługiwane jest tylko ostatnie, więc koszt odświeżania
+    interfejsu nie rośnie z liczbą pobieranych obrazów.
+    """
+
+    def __init__(self, interval_ms=DRAIN_INTERVAL_MS):
+        self.interval_ms = interval_ms
+        self._queue = queue.Queue()
+        self._handlers = {EVENT_CALL: lambda fn, args: fn(*args)}
+        self._master = None
+
+    def subscribe(self, kind, handler):
+        self._handlers[kind] = handler
+
+    def post(self, kind, **data):
+        self._queue.put((kind, data))
+
+    def call(self, fn, *args):
+        """Wykonuje fn(*args) w wątku Tk (zamiennik master.after(0, ...) z wątków roboczych)."""
+        self.post(EVENT_CALL, fn=fn, args=args)
+
+    def start(self, master):
+        self._master = master
+        self._master.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        self._master = None
+
+    def _drain(self):
+        if self._master is None:
+            return
+
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        last_progress = max(
+            (i for i, (kind, _) in enumerate(events) if kind == EVENT_PROGRESS), default=None
+        )
+        for i, (kind, data) in enumerate(events):
+            if kind == EVENT_PROGRESS and i != last_progress:
+                continue
+            handler = self._handlers.get(kind)
+            if handler is None:
+                continue
+            try:
+                handler(**data)
+            except Exception as e:
+                print(f"[GUI] Błąd obsługi zdarzenia {kind}: {e}")
+
+        if self._master is not None:
+            self._master.after(self.interval_ms, self._drain)
@@ -10,9 +10,25 @@ from downloader.pexels_downloader import download_images_pexels
 from downloader.pixabay_downloader import download_images_pixabay
 from downloader.unsplash_downloader import download_images_unsplash
 from downloader.openverse_downloader import download_images_openverse
+from downloader.http_session import get_connection_stats
+from downloader.async_engine import ASYNCIO_AVAILABLE
+from downloader.search_cache import get_search_cache
+from downloader.blob_cache import get_blob_cache
+from validator.dedup_index import DEFAULT_MAX_DISTANCE
+from validator.image_validator import VALIDATION_BASIC, VALIDATION_STRICT
+from validator.validation_rules import (
+    report_validation_stats,
+    reset_validation_stats,
+    add_rejection_listener,
+    remove_rejection_listener,
+)
 
 from gui.cleaner_window import CleanerWindow
+from gui.thumbnail_cache import get_thumbnail_cache
+from gui.event_bus import EventBus, EVENT_PROGRESS, EVENT_REJECTED, EVENT_ERROR, EVENT_FINISHED
 from splitter.splitter import split_images
+from splitter.file_transfer import TRANSFER_COPY, TRANSFER_MOVE, TRANSFER_HARDLINK, TRANSFER_REFLINK
+from splitter.split_plan import SPLIT_HASH, GROUP_DUPLICATES, GROUP_SOURCE
 from resizer.image_resizer import apply_resize_to_folder
 from gui.source_selector import SourceSelector
 
@@ -146,6 +162,17 @@ class ImageDownloaderGUI:
         # format wyjściowy (konwersja)
         self.force_output_format = None
 
+        # zdarzenia z wątków roboczych – wątki nie dotykają widżetów bezpośrednio
+        self.events = EventBus()
+        self.events.subscribe(EVENT_PROGRESS, self._on_progress_event)
+        self.events.subscribe(EVENT_REJECTED, self._on_rejected_event)
+        self.events.subscribe(EVENT_ERROR, self._on_error_event)
+        self.events.subscribe(EVENT_FINISHED, self._on_finished_event)
+        self.events.start(master)
+        self.rejected_count = 0
+        self._status_progress = ""
+        add_rejection_listener(self._on_rejection)
+
         # =========================
         #   SCROLLABLE MAIN FRAME
         # =========================
@@ -302,6 +329,40 @@ class ImageDownloaderGUI:
             anchor="w")
         tk.Radiobutton(c, text="Priorytet kolejności (prioritize)", variable=self.split_mode, value="prioritize",
                        bg=self.C_CARD).pack(anchor="w")
+        tk.Radiobutton(c, text="Stały według treści (hash – nowe pliki nie zmieniają podziału)",
+                       variable=self.split_mode, value=SPLIT_HASH, bg=self.C_CARD).pack(anchor="w")
+
+        seed_row = tk.Frame(c, bg=self.C_CARD)
+        seed_row.pack(anchor="w", pady=(4, 0))
+        tk.Label(seed_row, text="Seed (puste = losowy):", bg=self.C_CARD, fg=self.C_TEXT).pack(side="left")
+        self.split_seed_entry = tk.Entry(seed_row, width=10)
+        self.split_seed_entry.pack(side="left", padx=(6, 0))
+
+        tk.Label(c, text="Grupy trzymane w jednym zbiorze:", bg=self.C_CARD, fg=self.C_TEXT).pack(anchor="w",
+                                                                                               pady=(10, 0))
+        self.split_group_by = tk.StringVar(value="")
+
+        tk.Radiobutton(c, text="Brak", variable=self.split_group_by, value="", bg=self.C_CARD).pack(anchor="w")
+        tk.Radiobutton(c, text="Podobne obrazy (duplikaty)", variable=self.split_group_by, value=GROUP_DUPLICATES,
+                       bg=self.C_CARD).pack(anchor="w")
+        tk.Radiobutton(c, text="Źródło pobrania", variable=self.split_group_by, value=GROUP_SOURCE,
+                       bg=self.C_CARD).pack(anchor="w")
+
+        self.split_incremental = tk.BooleanVar(value=False)
+        tk.Checkbutton(c, text="Dopisz do istniejącego podziału (przyrostowo, według treści)",
+                       variable=self.split_incremental, bg=self.C_CARD).pack(anchor="w", pady=(10, 0))
+
+        tk.Label(c, text="Zapis plików do zbiorów:", bg=self.C_CARD, fg=self.C_TEXT).pack(anchor="w", pady=(10, 0))
+        self.split_transfer = tk.StringVar(value=TRANSFER_MOVE)
+
+        tk.Radiobutton(c, text="Przenieś (najszybciej)", variable=self.split_transfer, value=TRANSFER_MOVE,
+                       bg=self.C_CARD).pack(anchor="w")
+        tk.Radiobutton(c, text="Reflink (kopia copy-on-write)", variable=self.split_transfer, value=TRANSFER_REFLINK,
+                       bg=self.C_CARD).pack(anchor="w")
+        tk.Radiobutton(c, text="Twarde dowiązanie (hardlink)", variable=self.split_transfer, value=TRANSFER_HARDLINK,
+                       bg=self.C_CARD).pack(anchor="w")
+        tk.Radiobutton(c, text="Kopiuj", variable=self.split_transfer, value=TRANSFER_COPY,
+                       bg=self.C_CARD).pack(anchor="w")
 
         tk.Label(c, text="Udziały procentowe:", bg=self.C_CARD, fg=self.C_TEXT).pack(anchor="w", pady=(10, 0))
 
@@ -451,6 +512,24 @@ class ImageDownloaderGUI:
         self.height_entry.insert(0, "224")
         self.height_entry.grid(row=0, column=3, sticky="w")
 
+        self.fast_resize = tk.BooleanVar(value=False)
+        self.fast_resize_cb = tk.Checkbutton(
+            c,
+            text="Szybkie zmniejszanie (JPEG draft + reduce)",
+            variable=self.fast_resize,
+            bg=self.C_CARD
+        )
+        self.fast_resize_cb.pack(anchor="w")
+
+        self.resize_on_ingest = tk.BooleanVar(value=False)
+        self.resize_on_ingest_cb = tk.Checkbutton(
+            c,
+            text="Skaluj już podczas pobierania (jeden zapis pliku)",
+            variable=self.resize_on_ingest,
+            bg=self.C_CARD
+        )
+        self.resize_on_ingest_cb.pack(anchor="w")
+
         self.update_resize_fields()
 
         # ----------------------------
@@ -506,9 +585,61 @@ class ImageDownloaderGUI:
         # ----------------------------
         c = card("Start", "Kliknij, aby rozpocząć pobieranie.")
 
+        tk.Label(c, text="Silnik pobierania:", bg=self.C_CARD, fg=self.C_TEXT).pack(anchor="w")
+        self.download_backend = tk.StringVar(value="threads")
+
+        tk.Radiobutton(c, text="Wątki (threads)", variable=self.download_backend, value="threads",
+                       bg=self.C_CARD).pack(anchor="w")
+        tk.Radiobutton(
+            c,
+            text="Asynchroniczny (asyncio)" if ASYNCIO_AVAILABLE else "Asynchroniczny (asyncio) – wymaga aiohttp",
+            variable=self.download_backend,
+            value="asyncio",
+            state="normal" if ASYNCIO_AVAILABLE else "disabled",
+            bg=self.C_CARD
+        ).pack(anchor="w", pady=(0, 10))
+
+        self.use_search_cache = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            c,
+            text="Zapamiętuj wyniki wyszukiwania (cache API)",
+            variable=self.use_search_cache,
+            bg=self.C_CARD
+        ).pack(anchor="w")
+
+        self.use_blob_cache = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            c,
+            text="Zapamiętuj pobrane obrazy (cache lokalny)",
+            variable=self.use_blob_cache,
+            bg=self.C_CARD
+        ).pack(anchor="w")
+
+        self.skip_duplicates = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            c,
+            text="Pomijaj podobne obrazy (także z innych źródeł)",
+            variable=self.skip_duplicates,
+            bg=self.C_CARD
+        ).pack(anchor="w")
+
+        self.reject_near_blank = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            c,
+            text="Odrzucaj prawie puste obrazy (placeholdery)",
+            variable=self.reject_near_blank,
+            bg=self.C_CARD
+        ).pack(anchor="w")
+
+        ttk.Button(c, text="Wyczyść cache", command=self.purge_caches).pack(
+            fill="x", pady=(4, 10))
+
         self.progress = tk.IntVar()
         self.progress_bar = ttk.Progressbar(c, orient="horizontal", length=300, mode="determinate")
-        self.progress_bar.pack(fill="x", pady=(0, 10))
+        self.progress_bar.pack(fill="x", pady=(0, 2))
+
+        self.download_status = tk.Label(c, text="", bg=self.C_CARD, fg=self.C_MUTED)
+        self.download_status.pack(anchor="w", pady=(0, 8))
 
         self.download_button = ttk.Button(c, text="Pobierz obrazy", command=self.start_download)
         self.download_button.pack(fill="x", pady=(0, 8))
@@ -525,7 +656,11 @@ class ImageDownloaderGUI:
 
     def return_to_mode_selector(self):
 
-        # Zamknij bieżące okno
+        # Zamknij bieżące okno (razem z kolejką zdarzeń i słuchaczem odrzuceń,
+        # które inaczej trzymałyby referencję do zniszczonego okna)
+        self.gui_alive = False
+        self.events.stop()
+        remove_rejection_listener(self._on_rejection)
         self.master.destroy()
 
         # Utwórz nowe główne okno i pokaż selektor trybu
@@ -824,11 +959,15 @@ class ImageDownloaderGUI:
             self.resize_radio_crop.config(state="normal")
             self.width_entry.config(state="normal")
             self.height_entry.config(state="normal")
+            self.fast_resize_cb.config(state="normal")
+            self.resize_on_ingest_cb.config(state="normal")
         else:
             self.resize_radio_resize.config(state="disabled")
             self.resize_radio_crop.config(state="disabled")
             self.width_entry.config(state="disabled")
             self.height_entry.config(state="disabled")
+            self.fast_resize_cb.config(state="disabled")
+            self.resize_on_ingest_cb.config(state="disabled")
 
     def get_resolution_filter(self):
         """Zwraca słownik z filtrami rozdzielczości lub None."""
@@ -877,6 +1016,12 @@ class ImageDownloaderGUI:
 
         return result
 
+    def get_dedup_max_distance(self):
+        return DEFAULT_MAX_DISTANCE if self.skip_duplicates.get() else None
+
+    def get_validation_mode(self):
+        return VALIDATION_STRICT if self.reject_near_blank.get() else VALIDATION_BASIC
+
     def infer_target_output_format(self):
 
         allowed = self.get_allowed_input_formats()
@@ -907,8 +1052,22 @@ class ImageDownloaderGUI:
             self.stop_download = True
             self.gui_alive = False
 
+        self.events.stop()
+        remove_rejection_listener(self._on_rejection)
         self.master.destroy()
 
+    def purge_caches(self):
+        try:
+            get_search_cache().purge()
+            get_blob_cache().purge()
+            get_thumbnail_cache().purge()
+            print("[CACHE] Wyczyszczono cache wyników wyszukiwania, pobranych obrazów i miniatur.")
+            if self.gui_alive:
+                messagebox.showinfo("Cache", "Wyczyszczono zapamiętane wyniki wyszukiwania i obrazy.")
+        except Exception as e:
+            if self.gui_alive:
+                messagebox.showerror("Błąd", f"Nie udało się wyczyścić cache:\n{e}")
+
     def choose_folder(self):
         folder = filedialog.askdirectory(title="Wybierz folder docelowy")
         self.folder_path.set(folder)
@@ -925,15 +1084,52 @@ class ImageDownloaderGUI:
             self.max_filesize_entry.config(state="normal")
 
     def update_progress(self, current, total):
+        # wywoływane z wątków roboczych po każdym obrazie / pliku – tylko zdarzenie,
+        # pasek odświeżany jest przy opróżnianiu kolejki (najnowszy stan)
         if not self.gui_alive:
             return
+        self.events.post(EVENT_PROGRESS, current=current, total=total)
 
+    # =========================
+    #   ZDARZENIA Z WĄTKÓW (wątek Tk)
+    # =========================
+
+    def _on_rejection(self, source, reason):
+        # wątek pobierania
+        if self.gui_alive:
+            self.events.post(EVENT_REJECTED, source=source, reason=reason)
+
+    def _on_progress_event(self, current, total):
         percent = int((current / total) * 100) if total > 0 else 0
+        self.progress_bar.config(value=percent)
+        self._update_download_status(f"{current}/{total}")
+
+    def _on_rejected_event(self, source, reason):
+        self.rejected_count += 1
+        self._update_download_status()
+
+    def _update_download_status(self, progress=None):
+        if progress is not None:
+            self._status_progress = progress
+        parts = [self._status_progress]
+        if self.rejected_count:
+            parts.append(f"odrzucone: {self.rejected_count}")
+        self.download_status.config(text="   ".join(p for p in parts if p))
+
+    def _on_error_event(self, title, message):
+        if self.gui_alive:
+            messagebox.showerror(title, message)
 
-        self.master.after(
-            0,
-            lambda: self.progress_bar.config(value=percent)
-        )
+    def _on_finished_event(self, reset_progress=False, title=None, message=None, warning=False):
+        self.download_button.config(state="normal")
+        self.back_button.config(state="normal")
+        if reset_progress:
+            self.progress_bar.config(value=0)
+        if title and self.gui_alive:
+            if warning:
+                messagebox.showwarning(title, message)
+            else:
+                messagebox.showinfo(title, message)
 
     def get_target_size_if_crop(self):
         if self.method_var.get() != "crop":
@@ -946,6 +1142,26 @@ class ImageDownloaderGUI:
         except:
             return None
 
+    def get_ingest_resize(self):
+        """Rozmiar docelowy do skalowania w downloaderze albo None (skalowanie po pobraniu)."""
+        if not (self.resize_enabled.get() and self.resize_on_ingest.get()):
+            return None
+
+        try:
+            return int(self.width_entry.get()), int(self.height_entry.get())
+        except ValueError:
+            return None
+
+    def get_split_seed(self):
+        """Seed podziału z pola tekstowego albo None (inny podział przy każdym uruchomieniu)."""
+        text = self.split_seed_entry.get().strip()
+        if not text:
+            return None
+        try:
+            return int(text)
+        except ValueError:
+            return text
+
     def request_stop_download(self):
         if self.gui_alive:
             resp = messagebox.askyesno(
@@ -974,6 +1190,10 @@ class ImageDownloaderGUI:
             self.back_button.config(state="disabled")
         self.stop_download = False
         self.download_in_progress = True
+        reset_validation_stats()
+        self.rejected_count = 0
+        self._status_progress = ""
+        self.download_status.config(text="")
 
 
         # ======================================================
@@ -1081,7 +1301,8 @@ class ImageDownloaderGUI:
                     return
 
                 class_dir = os.path.join(folder, class_name)
-                if os.path.exists(class_dir):
+                # w trybie przyrostowym istniejący zbiór jest uzupełniany, a nie nadpisywany
+                if os.path.exists(class_dir) and not self.split_incremental.get():
                     resp = messagebox.askyesnocancel(
                         "Folder już istnieje",
                         f"Folder zbioru:\n\n{class_dir}\n\njuż istnieje.\n"
@@ -1142,11 +1363,7 @@ class ImageDownloaderGUI:
 
                 def on_source(selected_source):
                     self.source_selector_window = None
-                    threading.Thread(
-                        target=self.run_download,
-                        args=(selected_source,),
-                        daemon=True
-                    ).start()
+                    self.run_download(selected_source)
 
                 def on_cancel_source():
                     self.source_selector_window = None
@@ -1169,7 +1386,7 @@ class ImageDownloaderGUI:
                     )
 
             if self.gui_alive:
-                self.master.after(0, continue_in_ui)
+                self.events.call(continue_in_ui)
 
         threading.Thread(
             target=internet_check_worker,
@@ -1179,10 +1396,32 @@ class ImageDownloaderGUI:
     # =========================
     #   WŁAŚCIWE POBIERANIE
     # =========================
+    def collect_download_settings(self):
+        """
+        Ustawienia pobierania odczytane z widżetów. Wywoływane w wątku Tk przed
+        startem wątku roboczego – wątek dostaje zwykły słownik i nie dotyka zmiennych Tk.
+        """
+        return dict(
+            method=self.method_var.get(),
+            min_size=self.get_target_size_if_crop(),
+            allowed_formats=self.get_allowed_input_formats(),
+            resolution_filter=self.get_resolution_filter(),
+            force_output_format=self.force_output_format,
+            filesize_filter=self.get_filesize_filter(),
+            backend=self.download_backend.get(),
+            use_search_cache=self.use_search_cache.get(),
+            use_blob_cache=self.use_blob_cache.get(),
+            dedup_max_distance=self.get_dedup_max_distance(),
+            validation_mode=self.get_validation_mode(),
+            resize_to=self.get_ingest_resize(),
+            fast_resize=self.fast_resize.get(),
+        )
+
     def run_download(self, source):
-        threading.Thread(target=self._download_thread, args=(source,)).start()
+        settings = self.collect_download_settings()
+        threading.Thread(target=self._download_thread, args=(source, settings), daemon=True).start()
 
-    def _download_thread(self, source):
+    def _download_thread(self, source, settings):
         query = self.query
         class_name = self.class_name
         folder = self.folder
@@ -1204,55 +1443,66 @@ class ImageDownloaderGUI:
 
             if missing <= 0:
                 if self.gui_alive:
-                    self.master.after(0, lambda: self.prompt_next_action(tmp_dir, query, expected_count, source))
+                    self.events.call(lambda: self.prompt_next_action(tmp_dir, query, expected_count, source))
                 return
 
-            downloaded = self.download_from_source(source, query, missing, tmp_dir)
+            downloaded = self.download_from_source(source, query, missing, tmp_dir, settings)
             print(f"[{source.upper()}] ZAKOŃCZONO – pobrano: {downloaded}, oczekiwane: {missing}")
+            print(f"[HTTP] Połączenia: {get_connection_stats()}")
 
             # po udanym pobieraniu sprawdzamy, czy mamy komplet
             if self.gui_alive:
-                self.master.after(0, lambda: self.after_download_phase(source, tmp_dir, query, expected_count))
+                self.events.call(lambda: self.after_download_phase(source, tmp_dir, query, expected_count))
 
         except RateLimitException:
             print(f"[{source}] Przekroczony limit lub błąd — pytam o nowe źródło")
             if self.gui_alive:
-                self.master.after(0, lambda: self.handle_rate_limit(source))
+                self.events.call(lambda: self.handle_rate_limit(source))
 
         except TooManyFormatFilteredException as e:
             print(f"[{source}] FORMAT FILTER: {e}")
             if self.gui_alive:
-                self.master.after(0, lambda: self.handle_format_filtered(source, str(e)))
+                self.events.call(lambda exc=e: self.handle_format_filtered(source, str(exc)))
 
         except TooManyResolutionFilteredException as e:
             print(f"[{source}] RESOLUTION FILTER: {e}")
             if self.gui_alive:
-                self.master.after(0, lambda: self.handle_resolution_filtered(source, str(e)))
+                self.events.call(lambda exc=e: self.handle_resolution_filtered(source, str(exc)))
 
         except TooManyFilesizeFilteredException as e:
             print(f"[{source}] FILESIZE FILTER: {e}")
             if self.gui_alive:
-                self.master.after(0, lambda: self.handle_filesize_filtered(source, str(e)))
+                self.events.call(lambda exc=e: self.handle_filesize_filtered(source, str(exc)))
 
         except SourceExhaustedException as e:
             print(f"[{source}] EXHAUSTED: {e}")
             if self.gui_alive:
-                self.master.after(0, lambda exc=e: self.handle_source_exhausted(source, str(exc)))
+                self.events.call(lambda exc=e: self.handle_source_exhausted(source, str(exc)))
 
         except DownloadCancelledException:
             print("[STOP] Pobieranie przerwane przez użytkownika.")
             self.cleanup_tmp_dir()
             if self.gui_alive:
-                self.master.after(0, lambda: messagebox.showinfo(
-                "Pobieranie przerwane",
-                "Pobieranie zostało przerwane przez użytkownika."
-                ))
-            if self.gui_alive:
-                self.master.after(0, lambda: self.download_button.config(state="normal"))
-                self.master.after(0, lambda: self.back_button.config(state="normal"))
-                self.master.after(0, lambda: self.progress_bar.config(value=0))
+                self.events.post(
+                    EVENT_FINISHED,
+                    reset_progress=True,
+                    title="Pobieranie przerwane",
+                    message="Pobieranie zostało przerwane przez użytkownika.",
+                )
             return
 
+        except Exception as e:
+            # nieoczekiwany błąd (np. brak aiohttp dla silnika asyncio) – wątek nie może
+            # zginąć po cichu z zablokowanymi przyciskami
+            self._report_download_error(source, e)
+
+
+    def _report_download_error(self, source, error):
+        print(f"[{source}] BŁĄD: {error}")
+        self.download_in_progress = False
+        if self.gui_alive:
+            self.events.post(EVENT_ERROR, title="Błąd pobierania", message=f"{source}: {error}")
+            self.events.post(EVENT_FINISHED, reset_progress=True)
 
     def after_download_phase(self, source, tmp_dir, query, expected_count):
         current_files = [
@@ -1541,20 +1791,12 @@ class ImageDownloaderGUI:
     # =========================
     #   WYBÓR ŹRÓDŁA I RESUME
     # =========================
-    def download_from_source(self, source, query, missing, save_dir):
-        allowed_formats = self.get_allowed_input_formats()
-        resolution_filter = self.get_resolution_filter()
-
+    def download_from_source(self, source, query, missing, save_dir, settings):
         common_kwargs = dict(
             progress_callback=self.update_progress,
             start_index=utils.get_next_image_index(save_dir),
-            method=self.method_var.get(),
-            min_size=self.get_target_size_if_crop(),
-            allowed_formats=allowed_formats,
-            resolution_filter=resolution_filter,
-            force_output_format=self.force_output_format,
-            filesize_filter=self.get_filesize_filter(),
             should_stop=lambda: self.stop_download,
+            **settings,
         )
 
         if source == "google":
@@ -1571,7 +1813,7 @@ class ImageDownloaderGUI:
         print(f"Nieznane źródło: {source}")
         return 0
 
-    def dispatch_download(self, source, query, missing, tmp_dir, progress_callback=None, start_index=0):
+    def dispatch_download(self, source, query, missing, tmp_dir, settings, progress_callback=None, start_index=0):
         func = {
             "google": download_images_google,
             "pexels": download_images_pexels,
@@ -1584,8 +1826,6 @@ class ImageDownloaderGUI:
             print(f"Nieznane źródło: {source}")
             return 0
 
-        allowed_formats = self.get_allowed_input_formats()
-        resolution_filter = self.get_resolution_filter()
         start_index = utils.get_next_image_index(tmp_dir)
 
         return func(
@@ -1594,22 +1834,18 @@ class ImageDownloaderGUI:
             tmp_dir,
             progress_callback=progress_callback,
             start_index=start_index,
-            method=self.method_var.get(),
-            min_size=self.get_target_size_if_crop(),
-            allowed_formats=allowed_formats,
-            resolution_filter=resolution_filter,
-            force_output_format=self.force_output_format,
-            filesize_filter=self.get_filesize_filter(),
             should_stop=lambda: self.stop_download,
+            **settings,
         )
 
     def run_download_with_resume(self, source, tmp_dir, query, expected_count, current_count):
+        settings = self.collect_download_settings()
         threading.Thread(
             target=self._resume_download_thread,
-            args=(source, tmp_dir, query, expected_count, current_count)
+            args=(source, tmp_dir, query, expected_count, current_count, settings)
         ).start()
 
-    def _resume_download_thread(self, source, tmp_dir, query, expected_count, _current_count_ignored):
+    def _resume_download_thread(self, source, tmp_dir, query, expected_count, _current_count_ignored, settings):
         print(f"Kontynuuję pobieranie z nowego źródła: {source}")
 
         current_files = [
@@ -1624,7 +1860,7 @@ class ImageDownloaderGUI:
         if missing <= 0:
             print(f"[{source}] RESUME: nic nie brakuje, pomijam dodatkowe pobieranie.")
             if self.gui_alive:
-                self.master.after(0, lambda: self.prompt_next_action(tmp_dir, query, expected_count, source))
+                self.events.call(lambda: self.prompt_next_action(tmp_dir, query, expected_count, source))
             return
 
         try:
@@ -1633,56 +1869,61 @@ class ImageDownloaderGUI:
                 query,
                 missing,
                 tmp_dir,
+                settings,
                 progress_callback=self.update_progress,
                 start_index=utils.get_next_image_index(tmp_dir),
             )
             print(f"[{source.upper()} - RESUME] ZAKOŃCZONO – pobrano: {downloaded}, brakowało: {missing}")
+            print(f"[HTTP] Połączenia: {get_connection_stats()}")
 
         except RateLimitException:
             print(f"[{source}] Przekroczony limit lub błąd — pytam o nowe źródło")
             if self.gui_alive:
-                self.master.after(0, lambda: self.handle_rate_limit(source))
+                self.events.call(lambda: self.handle_rate_limit(source))
             return
 
         except TooManyFormatFilteredException as e:
             print(f"[{source}] FORMAT FILTER (RESUME): {e}")
             if self.gui_alive:
-                self.master.after(0, lambda: self.handle_format_filtered(source, str(e)))
+                self.events.call(lambda exc=e: self.handle_format_filtered(source, str(exc)))
             return
 
         except TooManyResolutionFilteredException as e:
             print(f"[{source}] RESOLUTION FILTER (RESUME): {e}")
             if self.gui_alive:
-                self.master.after(0, lambda: self.handle_resolution_filtered(source, str(e)))
+                self.events.call(lambda exc=e: self.handle_resolution_filtered(source, str(exc)))
             return
 
         except TooManyFilesizeFilteredException as e:
             print(f"[{source}] FILESIZE FILTER: {e}")
             if self.gui_alive:
-                self.master.after(0, lambda: self.handle_filesize_filtered(source, str(e)))
+                self.events.call(lambda exc=e: self.handle_filesize_filtered(source, str(exc)))
             return
 
         except SourceExhaustedException as e:
             print(f"[{source}] EXHAUSTED (RESUME): {e}")
             if self.gui_alive:
-                self.master.after(0, lambda exc=e: self.handle_source_exhausted(source, str(exc)))
+                self.events.call(lambda exc=e: self.handle_source_exhausted(source, str(exc)))
             return
 
         except DownloadCancelledException:
             print("[STOP] Pobieranie przerwane przez użytkownika.")
             self.cleanup_tmp_dir()
             if self.gui_alive:
-                self.master.after(0, lambda: messagebox.showinfo(
-                "Pobieranie przerwane",
-                "Pobieranie zostało przerwane przez użytkownika."
-                ))
-                self.master.after(0, lambda: self.download_button.config(state="normal"))
-                self.master.after(0, lambda: self.back_button.config(state="normal"))
-                self.master.after(0, lambda: self.progress_bar.config(value=0))
+                self.events.post(
+                    EVENT_FINISHED,
+                    reset_progress=True,
+                    title="Pobieranie przerwane",
+                    message="Pobieranie zostało przerwane przez użytkownika.",
+                )
                 self.download_in_progress = False
                 self.stop_download = False
             return
 
+        except Exception as e:
+            self._report_download_error(source, e)
+            return
+
 
         new_count = len([
             f for f in os.listdir(tmp_dir)
@@ -1695,15 +1936,15 @@ class ImageDownloaderGUI:
 
             if not self.available_sources:
                 if self.gui_alive:
-                    self.master.after(0, lambda: messagebox.showwarning(
-                    "Brak źródeł",
-                    "Wszystkie źródła zostały wykorzystane."
-                    ))
-                    self.master.after(0, lambda: self.download_button.config(state="normal"))
-                    self.master.after(0, lambda: self.back_button.config(state="normal"))
+                    self.events.post(
+                        EVENT_FINISHED,
+                        title="Brak źródeł",
+                        message="Wszystkie źródła zostały wykorzystane.",
+                        warning=True,
+                    )
                 return
             if self.gui_alive:
-                self.master.after(0, lambda: SourceSelector(
+                self.events.call(lambda: SourceSelector(
                     self.master,
                     self.available_sources,
                     lambda new_src: self.run_download_with_resume(
@@ -1714,7 +1955,7 @@ class ImageDownloaderGUI:
             ))
         else:
             if self.gui_alive:
-                self.master.after(0, lambda: self.prompt_next_action(tmp_dir, query, expected_count, source))
+                self.events.call(lambda: self.prompt_next_action(tmp_dir, query, expected_count, source))
 
     # =========================
     #   CLEAN / RESIZE / SPLIT
@@ -1766,30 +2007,27 @@ class ImageDownloaderGUI:
             self.prompt_next_action(tmp_dir, query, expected_count, source)
 
     def process_resize_and_split(self, tmp_dir):
+        """
+        Zbiera ustawienia skalowania i podziału w wątku Tk; samo skalowanie
+        i przenoszenie plików odbywa się w wątku roboczym (_resize_and_split_thread).
+        """
         self.download_in_progress = False
         self.stop_download = False
+        report_validation_stats()
+
+        resize_to = None
         if self.resize_enabled.get():
             try:
-                width = int(self.width_entry.get())
-                height = int(self.height_entry.get())
-                apply_resize_to_folder(tmp_dir, (width, height), self.method_var.get())
+                resize_to = (int(self.width_entry.get()), int(self.height_entry.get()))
             except Exception as e:
                 if self.gui_alive:
-                    self.master.after(0, lambda: messagebox.showerror("Błąd", f"Nie udało się przeskalować: {e}"))
+                    messagebox.showerror("Błąd", f"Nie udało się przeskalować: {e}")
                 self.download_button.config(state="normal")
                 self.back_button.config(state="normal")
                 return
 
         folder = self.folder_path.get()
         class_name = self.class_entry.get()
-        save_dir = os.path.join(folder, class_name)
-
-        train_ratio = self.train_scale.get()
-        valid_ratio = self.valid_scale.get()
-        test_ratio = self.test_scale.get()
-
-
-
 
         subsets = []
         if self.use_train.get():
@@ -1799,16 +2037,66 @@ class ImageDownloaderGUI:
         if self.use_test.get():
             subsets.append("test")
 
-
-        split_images(
-            tmp_dir,
-            save_dir,
-            (train_ratio, valid_ratio, test_ratio),
-            subsets,
-            mode=self.split_mode.get()
+        settings = dict(
+            resize_to=resize_to,
+            method=self.method_var.get(),
+            fast=self.fast_resize.get(),
+            save_dir=os.path.join(folder, class_name),
+            ratios=(self.train_scale.get(), self.valid_scale.get(), self.test_scale.get()),
+            subsets=subsets,
+            mode=self.split_mode.get(),
+            transfer=self.split_transfer.get(),
+            seed=self.get_split_seed(),
+            group_by=self.split_group_by.get() or None,
+            incremental=self.split_incremental.get(),
         )
-        shutil.rmtree(tmp_dir)
+        threading.Thread(target=self._resize_and_split_thread, args=(tmp_dir, settings)).start()
+
+    def _resize_and_split_thread(self, tmp_dir, settings):
+        if settings["resize_to"] is not None:
+            try:
+                # pliki skalowane już przy pobieraniu są pomijane (odczyt samego nagłówka),
+                # więc to przejście dotyczy tylko plików z wcześniejszych sesji
+                apply_resize_to_folder(
+                    tmp_dir, settings["resize_to"], settings["method"], fast=settings["fast"]
+                )
+            except Exception as e:
+                if self.gui_alive:
+                    self.events.post(EVENT_ERROR, title="Błąd", message=f"Nie udało się przeskalować: {e}")
+                    self.events.post(EVENT_FINISHED)
+                return
+
+        save_dir = settings["save_dir"]
+
+        # split_images raportuje postęp osobno dla każdego zbioru – pasek pokazuje sumę
+        subset_progress = {}
+
+        def on_split_progress(subset, done, total):
+            subset_progress[subset] = (done, total)
+            self.update_progress(
+                sum(d for d, _ in subset_progress.values()),
+                sum(t for _, t in subset_progress.values()),
+            )
+
+        try:
+            split_images(
+                tmp_dir,
+                save_dir,
+                settings["ratios"],
+                settings["subsets"],
+                mode=settings["mode"],
+                transfer=settings["transfer"],
+                progress_callback=on_split_progress,
+                seed=settings["seed"],
+                group_by=settings["group_by"],
+                incremental=settings["incremental"],
+            )
+            shutil.rmtree(tmp_dir)
+        except Exception as e:
+            if self.gui_alive:
+                self.events.post(EVENT_ERROR, title="Błąd", message=f"Nie udało się podzielić zbioru: {e}")
+                self.events.post(EVENT_FINISHED)
+            return
+
         if self.gui_alive:
-            self.master.after(0, lambda: messagebox.showinfo("Zakończono", f"Dane zapisano w: {save_dir}"))
-        self.download_button.config(state="normal")
-        self.back_button.config(state="normal")
+            self.events.post(EVENT_FINISHED, title="Zakończono", message=f"Dane zapisano w: {save_dir}")
@@ -2,7 +2,9 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox
 import os
+import threading
 from resizer.image_resizer import apply_resize_to_folder2
+from gui.event_bus import EventBus, EVENT_PROGRESS
 from gui.mode_selector import ModeSelectorWindow
 
 
@@ -11,7 +13,7 @@ class ResizeExistingWindow:
     def __init__(self, master):
         self.master = master
         self.master.title("PRACA INŻYNIERSKA – zmiana rozdzielczości")
-        self.master.geometry("420x360")
+        self.master.geometry("420x460")
         self.master.resizable(False, False)
         self.master.configure(bg="#f4f6fb")
 
@@ -51,15 +53,41 @@ class ResizeExistingWindow:
         self.h_entry.insert(0, "224")
         self.h_entry.grid(row=1, column=1)
 
+        tk.Label(size, text="Procesy:", bg="#ffffff").grid(row=2, column=0, sticky="e", padx=5)
+        self.workers_entry = tk.Entry(size, width=8)
+        self.workers_entry.insert(0, str(os.cpu_count() or 1))
+        self.workers_entry.grid(row=2, column=1)
+
+        self.fast_resize = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            card,
+            text="Szybkie zmniejszanie (JPEG draft + reduce)",
+            variable=self.fast_resize,
+            bg="#ffffff"
+        ).pack(anchor="w")
+
         ttk.Separator(card).pack(fill="x", pady=15)
 
-        ttk.Button(
+        self.start_button = ttk.Button(
             card,
             text="Rozpocznij skalowanie",
             command=self.start_resize
-        ).pack(fill="x")
+        )
+        self.start_button.pack(fill="x")
+
+        self.progress_bar = ttk.Progressbar(card, orient="horizontal", length=300, mode="determinate")
+        self.progress_bar.pack(fill="x", pady=(10, 0))
+
+        self.status_var = tk.StringVar(value="")
+        tk.Label(card, textvariable=self.status_var, fg="#6b7280", bg="#ffffff").pack(anchor="w")
+
+        # wątek skalowania komunikuje się z oknem wyłącznie przez kolejkę zdarzeń
+        self.events = EventBus()
+        self.events.subscribe(EVENT_PROGRESS, self.update_progress)
+        self.events.start(self.master)
 
     def return_to_mode_selector(self):
+        self.events.stop()
         self.master.destroy()
 
         new_root = tk.Tk()
@@ -81,11 +109,44 @@ class ResizeExistingWindow:
         try:
             w = int(self.w_entry.get())
             h = int(self.h_entry.get())
+            workers = max(1, int(self.workers_entry.get()))
         except ValueError:
-            messagebox.showerror("Błąd", "Wymiary muszą być liczbami.")
+            messagebox.showerror("Błąd", "Wymiary i liczba procesów muszą być liczbami.")
             return
         self.back_button.config(state="disabled")
-        apply_resize_to_folder2(folder, (w, h), method="resize")
+        self.start_button.config(state="disabled")
+        self.progress_bar.config(value=0)
+        self.status_var.set("Skalowanie...")
 
-        messagebox.showinfo("Sukces", "Skalowanie zakończone.")
+        # skalowanie w tle – okno odpowiada, a pasek postępu się odświeża
+        threading.Thread(
+            target=self._resize_thread,
+            args=(folder, (w, h), workers, self.fast_resize.get()),
+            daemon=True
+        ).start()
+
+    def _resize_thread(self, folder, size, workers, fast):
+        def on_progress(done, total):
+            self.events.post(EVENT_PROGRESS, current=done, total=total)
+
+        try:
+            resized = apply_resize_to_folder2(
+                folder, size, method="resize", max_workers=workers,
+                progress_callback=on_progress, fast=fast
+            )
+        except Exception as e:
+            self.events.call(lambda exc=e: self.finish_resize(error=str(exc)))
+            return
+        self.events.call(lambda: self.finish_resize(resized=resized))
+
+    def update_progress(self, current, total):
+        self.progress_bar.config(maximum=total, value=current)
+        self.status_var.set(f"Przeskalowano {current}/{total}")
+
+    def finish_resize(self, resized=0, error=None):
         self.back_button.config(state="normal")
+        self.start_button.config(state="normal")
+        if error:
+            messagebox.showerror("Błąd", f"Nie udało się przeskalować: {error}")
+            return
+        messagebox.showinfo("Sukces", f"Skalowanie zakończone ({resized} plików).")
@@ -0,0 +1,165 @@
+import os
+import sqlite3
+import threading
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from utils.utils import get_cache_dir
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024    # ok. 20–30 tys. miniatur 200x200
+THUMB_QUALITY = 85
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ThumbnailCache:
+    """
+    Trwała pamięć miniatur okna czyszczenia (CleanerWindow).
+
+    Miniatury trzymane są jako małe pliki JPEG (PNG dla obrazów
+    z przezroczystością) w jednej bazie SQLite. Wpis jest ważny, dopóki
+    plik źródłowy ma ten sam rozmiar i mtime. Plik tylko przemianowany
+    (renumeracja po czyszczeniu – ten sam folder, rozmiar i mtime)
+    odnajdywany jest po tych polach, bez ponownego dekodowania.
+
+    Wpisy plików, których już nie ma, usuwa prune(), a wpisy z folderów
+    usuniętych w całości (np. _tmp_<klasa> po podziale) – otwarcie
+    pamięci. Po przekroczeniu `max_bytes` usuwane są najdawniej używane (LRU).
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(get_cache_dir(), "thumbnails.sqlite")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        # wiele małych zapisów z wątków dekodujących – WAL bez fsync po każdym
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS thumbs ("
+            " path TEXT PRIMARY KEY,"
+            " folder TEXT,"
+            " file_size INTEGER,"
+            " mtime INTEGER,"
+            " thumb_size TEXT,"
+            " data BLOB,"
+            " last_used REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS thumbs_file ON thumbs (folder, file_size, mtime)")
+        self._db.commit()
+        self._forget_missing_folders()
+
+    def _delete(self, path):
+        row = self._db.execute("SELECT LENGTH(data) FROM thumbs WHERE path = ?", (path,)).fetchone()
+        if row is not None:
+            self._db.execute("DELETE FROM thumbs WHERE path = ?", (path,))
+            self._total -= row[0]
+
+    def _forget_missing_folders(self):
+        with self._lock:
+            folders = [row[0] for row in self._db.execute("SELECT DISTINCT folder FROM thumbs")]
+            for folder in folders:
+                if not os.path.isdir(folder):
+                    self._db.execute("DELETE FROM thumbs WHERE folder = ?", (folder,))
+            self._db.commit()
+            self._total = self._db.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM thumbs").fetchone()[0]
+
+    def get(self, path, thumb_size):
+        """Zapisana miniatura pliku jako obraz PIL albo None (brak lub plik zmieniony)."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        size_key = f"{thumb_size[0]}x{thumb_size[1]}"
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM thumbs WHERE path = ? AND file_size = ? AND mtime = ? AND thumb_size = ?",
+                (path, st.st_size, st.st_mtime_ns, size_key),
+            ).fetchone()
+            if row is None:
+                # plik przemianowany – ten sam folder, rozmiar i mtime
+                row = self._db.execute(
+                    "SELECT data, path FROM thumbs"
+                    " WHERE folder = ? AND file_size = ? AND mtime = ? AND thumb_size = ?",
+                    (os.path.dirname(path), st.st_size, st.st_mtime_ns, size_key),
+                ).fetchone()
+                if row is None:
+                    return None
+                if os.path.exists(row[1]):
+                    return None     # inny, wciąż istniejący plik – przypadkowa zgodność
+                self._delete(path)
+                self._db.execute("UPDATE thumbs SET path = ? WHERE path = ?", (path, row[1]))
+            self._db.execute("UPDATE thumbs SET last_used = ? WHERE path = ?", (time.time(), path))
+            self._db.commit()
+
+        img = Image.open(BytesIO(row[0]))
+        img.load()
+        return img
+
+    def put(self, path, thumb_size, img):
+        """Zapisuje miniaturę `img` (obraz PIL) pliku `path`."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+
+        buf = BytesIO()
+        if img.mode in ("RGBA", "LA", "P"):
+            img.save(buf, format="PNG", optimize=True)
+        else:
+            img.save(buf, format="JPEG", quality=THUMB_QUALITY)
+        data = buf.getvalue()
+
+        with self._lock:
+            self._delete(path)
+            self._db.execute(
+                "INSERT INTO thumbs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    path, os.path.dirname(path), st.st_size, st.st_mtime_ns,
+                    f"{thumb_size[0]}x{thumb_size[1]}", data, time.time(),
+                ),
+            )
+            self._total += len(data)
+            self._evict()
+            self._db.commit()
+
+    def prune(self, folder, names):
+        """Usuwa wpisy plików z `folder`, których nie ma już wśród `names`."""
+        folder = os.path.abspath(folder)
+        names = set(names)
+        with self._lock:
+            stale = [
+                path for (path,) in self._db.execute("SELECT path FROM thumbs WHERE folder = ?", (folder,))
+                if os.path.basename(path) not in names
+            ]
+            for path in stale:
+                self._delete(path)
+            self._db.commit()
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+
+        for path, size in self._db.execute(
+            "SELECT path, LENGTH(data) FROM thumbs ORDER BY last_used"
+        ).fetchall():
+            self._db.execute("DELETE FROM thumbs WHERE path = ?", (path,))
+            self._total -= size
+            if self._total <= self.max_bytes:
+                break
+
+    def purge(self):
+        """Usuwa wszystkie zapisane miniatury."""
+        with self._lock:
+            self._db.execute("DELETE FROM thumbs")
+            self._db.commit()
+            self._total = 0
+
+
+def get_thumbnail_cache():
+    """Zwraca wspólną dla procesu pamięć miniatur."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ThumbnailCache()
+        return _cache
@@ -1,4 +1,5 @@
 import ctypes
+import multiprocessing
 import tkinter as tk
 import os
 import sys
@@ -20,6 +21,9 @@ def resource_path(relative_path: str) -> str:
 
 
 if __name__ == "__main__":
+    # wymagane przez pulę procesów skalowania w wersji spakowanej (PyInstaller)
+    multiprocessing.freeze_support()
+
     root = tk.Tk()
 
     # IKONA OKNA
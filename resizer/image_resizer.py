@@ -1,5 +1,16 @@
 from PIL import Image
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from validator.image_pipeline import DecodedImage
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif")
+CHUNKS_PER_WORKER = 4     # ile paczek przypada średnio na jeden proces
+MAX_CHUNK_SIZE = 64       # plików w jednej paczce
+
+# szybkie zmniejszanie (fast=True)
+DRAFT_MARGIN = 2          # JPEG draft dekoduje do co najmniej 2x rozmiaru docelowego
+REDUCING_GAP = 3.0        # reduce() do ~3x rozmiaru docelowego, dalej LANCZOS
 
 
 def normalize_save_format(ext: str):
@@ -19,8 +30,40 @@ def normalize_save_format(ext: str):
     return ext.upper()
 
 
-def resize_image(image, size):
-    return image.resize(size, Image.Resampling.LANCZOS)
+def prepare_draft(image, size):
+    """
+    Dla jeszcze niezdekodowanego JPEG włącza dekodowanie DCT w skali
+    1/2, 1/4 albo 1/8 – największej, przy której obraz ma nadal co najmniej
+    DRAFT_MARGIN x `size`. Dla innych formatów i obrazów już zdekodowanych
+    nic nie robi.
+    """
+    if image.format != "JPEG":
+        return
+    w, h = size
+    image.draft(image.mode, (w * DRAFT_MARGIN, h * DRAFT_MARGIN))
+
+
+def resize_image(image, size, fast=False):
+    """
+    Skalowanie LANCZOS do `size`.
+    fast=True: przy dużym zmniejszeniu JPEG dekodowany jest od razu
+    w mniejszej skali (draft), a reszta zmniejszenia idzie przez szybkie
+    reduce() (reducing_gap) – LANCZOS liczony jest tylko na ostatnim kroku.
+    """
+    if not fast:
+        return image.resize(size, Image.Resampling.LANCZOS)
+
+    prepare_draft(image, size)
+    return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+
+
+def get_transform(size, method="resize", fast=False):
+    """Zwraca funkcję img -> img wykonującą skalowanie albo crop do `size`."""
+    if method == "resize":
+        return lambda img: resize_image(img, size, fast=fast)
+    if method == "crop":
+        return lambda img: center_crop(img, size)
+    return None
 
 
 def center_crop(image, size):
@@ -33,32 +76,6 @@ def center_crop(image, size):
     return image.crop((left, top, right, bottom))
 
 
-def apply_resize_to_folder(folder, size, method='resize'):
-    for filename in os.listdir(folder):
-        if filename.lower().endswith((".jpg", ".jpeg", ".png", ".gif")):
-            path = os.path.join(folder, filename)
-            try:
-                img = Image.open(path)
-
-                # transformacja
-                if method == 'resize':
-                    img = resize_image(img, size)
-                elif method == 'crop':
-                    img = center_crop(img, size)
-
-                # normalizacja formatu do PIL
-                ext = os.path.splitext(filename)[1]  # np .jpg
-                save_fmt = normalize_save_format(ext)
-
-                # JPG musi być RGB
-                if save_fmt == "JPEG":
-                    img = img.convert("RGB")
-
-                img.save(path, format=save_fmt)
-
-            except Exception as e:
-                print(f" Błąd skalowania obrazu {filename}: {e}")
-
 def _ext_to_save_fmt_from_path(path: str) -> str | None:
     """
     Mapuje rozszerzenie pliku na format Pillow:
@@ -76,36 +93,133 @@ def _ext_to_save_fmt_from_path(path: str) -> str | None:
         return "GIF"
     return None
 
-def apply_resize_to_folder2(root_folder, size, method="resize"):
+
+def _resize_file(path, size, method="resize", fast=False):
+    """
+    Skaluje (lub przycina) jeden plik w miejscu; zwraca komunikat błędu albo None.
+    Pliki mające już rozmiar docelowy (np. skalowane przy pobieraniu)
+    są pomijane – sprawdzany jest tylko nagłówek, bez dekodowania.
+    """
+    save_fmt = _ext_to_save_fmt_from_path(path)
+    if save_fmt is None:
+        # na wszelki wypadek pomijamy nieobsługiwane rozszerzenia
+        return "nieobsługiwane rozszerzenie"
+    try:
+        with Image.open(path) as img:
+            if img.size == tuple(size):
+                return None
+
+            # transformacja; JPG/JPEG → RGB (konwersja już po skalowaniu)
+            DecodedImage(img).save(path, save_fmt, transform=get_transform(size, method, fast))
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def _resize_chunk(paths, size, method, fast=False):
+    """Zadanie procesu roboczego: skaluje paczkę plików, zwraca listę (ścieżka, błąd)."""
+    errors = []
+    for path in paths:
+        error = _resize_file(path, size, method, fast)
+        if error is not None:
+            errors.append((path, error))
+    return errors
+
+
+def list_images(folder, recursive=False):
+    """Ścieżki plików graficznych w folderze (recursive=True – także w podfolderach)."""
+    if not recursive:
+        return [
+            os.path.join(folder, f) for f in sorted(os.listdir(folder))
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(dirpath, filename))
+    return paths
+
+
+def batch_resize(
+    paths, size, method="resize", max_workers=None, chunk_size=None, progress_callback=None, fast=False
+):
+    """
+    Skaluje pliki `paths` w miejscu, równolegle w puli procesów
+    (dekodowanie i LANCZOS są ograniczone przez CPU, więc wątki nie pomogą).
+
+    Pliki dzielone są na paczki po `chunk_size` (domyślnie tak, żeby każdy
+    proces dostał kilka paczek – równe obciążenie przy różnych rozmiarach
+    plików, a jednocześnie mało komunikacji między procesami).
+    progress_callback(gotowe, wszystkie) wywoływany jest w wątku wywołującym
+    po każdej paczce. Małe zbiory (jedna paczka) skalowane są w bieżącym procesie.
+    fast=True włącza szybkie zmniejszanie (patrz resize_image).
+    Zwraca liczbę poprawnie przeskalowanych plików.
+    """
+    paths = list(paths)
+    total = len(paths)
+    if not total:
+        return 0
+
+    workers = max_workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = min(MAX_CHUNK_SIZE, max(1, total // (workers * CHUNKS_PER_WORKER)))
+    chunks = [paths[i:i + chunk_size] for i in range(0, total, chunk_size)]
+
+    done = 0
+    failed = 0
+
+    def finish_chunk(chunk, errors):
+        nonlocal done, failed
+        for path, error in errors:
+            print(f"Błąd skalowania obrazu {path}: {error}")
+        done += len(chunk)
+        failed += len(errors)
+        if progress_callback:
+            progress_callback(done, total)
+
+    if workers == 1 or len(chunks) == 1:
+        for chunk in chunks:
+            finish_chunk(chunk, _resize_chunk(chunk, size, method, fast))
+        return done - failed
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        futures = {
+            executor.submit(_resize_chunk, chunk, size, method, fast): chunk for chunk in chunks
+        }
+        for future in as_completed(futures):
+            finish_chunk(futures[future], future.result())
+
+    return done - failed
+
+
+def apply_resize_to_folder(folder, size, method='resize', max_workers=None, progress_callback=None, fast=False):
+    """Zmienia rozdzielczość wszystkich plików graficznych w `folder` (bez podfolderów)."""
+    return batch_resize(
+        list_images(folder),
+        size,
+        method,
+        max_workers=max_workers,
+        progress_callback=progress_callback,
+        fast=fast,
+    )
+
+
+def apply_resize_to_folder2(
+    root_folder, size, method="resize", max_workers=None, progress_callback=None, fast=False
+):
     """
     Rekurencyjnie przechodzi po `root_folder` i wszystkich podfolderach
     i zmienia rozdzielczość wszystkich plików graficznych
     (.jpg, .jpeg, .png, .gif).
     """
-    for dirpath, dirnames, filenames in os.walk(root_folder):
-        for filename in filenames:
-            if not filename.lower().endswith((".jpg", ".jpeg", ".png", ".gif")):
-                continue
-
-            path = os.path.join(dirpath, filename)
-            try:
-                with Image.open(path) as img:
-                    if method == "resize":
-                        img = resize_image(img, size)
-                    elif method == "crop":
-                        img = center_crop(img, size)
-
-                    save_fmt = _ext_to_save_fmt_from_path(path)
-                    if save_fmt is None:
-                        # na wszelki wypadek pomijamy nieobsługiwane rozszerzenia
-                        print(f"Pominięto plik o nieobsługiwanym rozszerzeniu: {path}")
-                        continue
-
-                    # JPG/JPEG → wymuś RGB
-                    if save_fmt == "JPEG":
-                        img = img.convert("RGB")
-
-                    img.save(path, format=save_fmt)
-
-            except Exception as e:
-                print(f"Błąd skalowania obrazu {path}: {e}")
+    return batch_resize(
+        list_images(root_folder, recursive=True),
+        size,
+        method,
+        max_workers=max_workers,
+        progress_callback=progress_callback,
+        fast=fast,
+    )
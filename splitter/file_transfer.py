@@ -0,0 +1,174 @@
+import ctypes
+import errno
+import os
+import platform
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+TRANSFER_COPY = "copy"
+TRANSFER_MOVE = "move"
+TRANSFER_HARDLINK = "hardlink"
+TRANSFER_REFLINK = "reflink"
+
+TRANSFER_MODES = (TRANSFER_COPY, TRANSFER_MOVE, TRANSFER_HARDLINK, TRANSFER_REFLINK)
+
+_FICLONE = 0x40049409      # ioctl Linux (Btrfs, XFS, bcachefs...) – klon pliku copy-on-write
+
+# błędy oznaczające brak obsługi metody (inny dysk, system plików bez linków / klonów),
+# a nie problem z konkretnym plikiem – tylko po nich metoda zastępowana jest kopią
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EMLINK, errno.ENOTTY, errno.ENOSYS,
+}
+
+DEFAULT_COPY_WORKERS = 8   # równoległe kopie – NVMe i udziały sieciowe potrzebują kilku strumieni
+COPY_BUFFER = 4 * 1024 * 1024
+
+
+def fast_copy(src, dst):
+    """
+    Kopiuje treść i uprawnienia pliku (jak shutil.copy).
+    Na Linuksie przez os.copy_file_range – dane nie przechodzą przez
+    przestrzeń użytkownika (a na NFS/SMB kopiowane są po stronie serwera);
+    w pozostałych przypadkach pętla z dużym buforem.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                size = os.fstat(fsrc.fileno()).st_size
+                copied = 0
+                while True:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), COPY_BUFFER)
+                    if not n:
+                        break
+                    copied += n
+            # niektóre systemy plików (procfs, część FUSE / sieciowych) zwracają 0
+            # przed końcem danych – niepełna kopia jest powtarzana zwykłą metodą
+            if copied == size:
+                shutil.copymode(src, dst)
+                return
+        except OSError:
+            pass    # np. starsze jądro lub system plików bez obsługi – zwykła kopia od nowa
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        shutil.copyfileobj(fsrc, fdst, COPY_BUFFER)
+    shutil.copymode(src, dst)
+
+
+def _reflink(src, dst):
+    """Klon copy-on-write (bez kopiowania danych); rzuca OSError, jeśli system plików go nie obsługuje."""
+    system = platform.system()
+
+    if system == "Linux":
+        import fcntl
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            except OSError:
+                fdst.close()
+                os.remove(dst)
+                raise
+        return
+
+    if system == "Darwin":
+        libc = ctypes.CDLL("libc.dylib", use_errno=True)
+        if libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        return
+
+    # Windows (ReFS block cloning) – nieobsługiwane, kopia zwykła
+    raise OSError(errno.EOPNOTSUPP, "reflink nieobsługiwany w tym systemie")
+
+
+class FileTransfer:
+    """
+    Przenosi pliki do podziału na zbiory wybraną metodą:
+
+        copy     – zwykła kopia (źródło zostaje),
+        move     – przeniesienie (w obrębie jednego systemu plików: zmiana nazwy),
+        hardlink – drugi wpis katalogowy do tych samych danych,
+        reflink  – klon copy-on-write (Btrfs/XFS/APFS).
+
+    Gdy metoda nie działa (np. źródło i cel na różnych dyskach – EXDEV,
+    system plików bez obsługi linków), plik jest kopiowany, a metoda
+    jest wyłączana dla kolejnych plików, żeby nie powtarzać nieudanych prób.
+    Inne błędy (brak pliku, brak uprawnień) są zgłaszane wyjątkiem i nie
+    zmieniają metody dla pozostałych plików.
+    `counts` zlicza faktycznie użyte metody.
+
+    transfer_all() wykonuje wiele transferów równolegle w puli wątków
+    (max_workers) – kopiowanie jest ograniczone przez I/O, więc kilka
+    strumieni naraz lepiej wykorzystuje dysk lub udział sieciowy.
+    """
+
+    def __init__(self, mode=TRANSFER_COPY, max_workers=DEFAULT_COPY_WORKERS):
+        if mode not in TRANSFER_MODES:
+            raise ValueError(f"Nieznana metoda przenoszenia plików: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.fallback = False
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def transfer(self, src, dst):
+        used = TRANSFER_COPY
+        if self.mode != TRANSFER_COPY and not self.fallback:
+            try:
+                if self.mode == TRANSFER_MOVE:
+                    os.replace(src, dst)
+                elif self.mode == TRANSFER_HARDLINK:
+                    if os.path.exists(dst):
+                        os.remove(dst)
+                    os.link(src, dst)
+                else:
+                    _reflink(src, dst)
+                used = self.mode
+            except OSError as e:
+                # EINVAL zgłasza FICLONE m.in. dla plików na różnych systemach plików
+                unsupported = e.errno in _UNSUPPORTED_ERRNOS or (
+                    self.mode == TRANSFER_REFLINK and e.errno == errno.EINVAL
+                )
+                if not unsupported:
+                    raise   # np. brak pliku źródłowego lub uprawnień – błąd tego pliku, metoda zostaje
+                with self._lock:
+                    if not self.fallback:
+                        print(f"[Podział] {self.mode} niedostępny ({e}) – kopiuję pliki.")
+                        self.fallback = True
+
+        if used == TRANSFER_COPY:
+            fast_copy(src, dst)
+            if self.mode == TRANSFER_MOVE:
+                # przeniesienie między dyskami: kopia + usunięcie źródła
+                os.remove(src)
+
+        with self._lock:
+            self.counts[used] = self.counts.get(used, 0) + 1
+        return used
+
+    def transfer_all(self, jobs, progress_callback=None):
+        """
+        jobs: lista (źródło, cel, grupa) – grupa to np. nazwa zbioru (train/valid/test).
+        progress_callback(grupa, gotowe, wszystkie) wywoływany jest po każdym
+        pliku, osobno dla każdej grupy (z wątku wywołującego); na starcie raz
+        dla każdej grupy z gotowe=0, żeby od początku znane były wszystkie sumy.
+        """
+        totals = {}
+        for _, _, group in jobs:
+            totals[group] = totals.get(group, 0) + 1
+        done = dict.fromkeys(totals, 0)
+
+        if progress_callback:
+            for group, total in totals.items():
+                progress_callback(group, 0, total)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            futures = {
+                executor.submit(self.transfer, src, dst): group for src, dst, group in jobs
+            }
+            for future in as_completed(futures):
+                future.result()
+                group = futures[future]
+                done[group] += 1
+                if progress_callback:
+                    progress_callback(group, done[group], totals[group])
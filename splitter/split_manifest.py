@@ -0,0 +1,86 @@
+import os
+
+from splitter.split_plan import SUBSETS
+
+MANIFEST_FILENAME = ".split_manifest.log"
+
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif")
+
+
+class SplitManifest:
+    """
+    Zapis podziału folderu klasy na zbiory: nazwa pliku -> (klucz treści,
+    klucz grupy, zbiór). Trzymany w pliku MANIFEST_FILENAME w folderze
+    klasy, obok podfolderów train/valid/test.
+
+    Dzięki niemu podział przyrostowy (split_images(incremental=True)) nie
+    musi czytać obrazów już rozdzielonych: przydział liczony jest z klucza
+    grupy, a nowe pliki o kluczu już obecnym w manifeście są pomijane.
+
+    Folder podzielony wcześniej bez manifestu jest przejmowany tak, jak
+    leży – takie pliki (klucz None) zostają w swoich zbiorach na stałe.
+    Tak samo traktowane są pliki dodane ręcznie do podfolderów po zapisie
+    manifestu, więc ich numery też są zajęte dla nowych plików.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_FILENAME)
+        self._entries = {}
+        self._load()
+
+    def _load(self):
+        present = {}
+        for subset in SUBSETS:
+            subset_path = os.path.join(self.folder, subset)
+            if os.path.isdir(subset_path):
+                present[subset] = {
+                    f for f in os.listdir(subset_path) if f.lower().endswith(_IMAGE_EXTENSIONS)
+                }
+
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    if len(parts) != 4:
+                        continue
+                    key, group, subset, name = parts
+                    # pliki usunięte ręcznie z folderu wypadają z manifestu
+                    if name in present.get(subset, ()):
+                        self._entries[name] = (
+                            None if key == "-" else key,
+                            None if group == "-" else group,
+                            subset,
+                        )
+
+        for subset, names in present.items():
+            for name in names:
+                if name not in self._entries:
+                    self._entries[name] = (None, None, subset)
+
+    def entries(self):
+        """Kopia manifestu: nazwa pliku -> (klucz treści, klucz grupy, zbiór)."""
+        return dict(self._entries)
+
+    def keys(self):
+        """Klucze treści plików już rozdzielonych."""
+        return {key for key, _, _ in self._entries.values() if key is not None}
+
+    def next_index(self):
+        """Pierwszy wolny numer pliku (nazwy są wspólne dla wszystkich zbiorów)."""
+        numbers = [
+            int(os.path.splitext(name)[0]) for name in self._entries
+            if os.path.splitext(name)[0].isdigit()
+        ]
+        return max(numbers, default=0) + 1
+
+    def set(self, name, key, group, subset):
+        self._entries[name] = (key, group, subset)
+
+    def save(self):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for name, (key, group, subset) in self._entries.items():
+                f.write(f"{key or '-'}\t{group or '-'}\t{subset}\t{name}\n")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import random
+
+from validator.dedup_index import get_dedup_index
+
+SPLIT_RANDOM = "random"          # losowo (powtarzalnie przy podanym seed)
+SPLIT_PRIORITIZE = "prioritize"  # kolejność numerów plików
+SPLIT_HASH = "hash"              # deterministycznie z treści – stabilne przy dodawaniu plików
+
+GROUP_DUPLICATES = "duplicates"  # (prawie) duplikaty według perceptual hash
+GROUP_SOURCE = "source"          # źródło pobrania (Pexels, Google, ...)
+
+SUBSETS = ("train", "valid", "test")
+
+
+def stable_fraction(key, seed=0):
+    """Liczba z [0, 1) wyznaczona przez (seed, key) – ta sama na każdym komputerze i przy każdym uruchomieniu."""
+    digest = hashlib.sha1(f"{seed}:{key}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+def subset_for_fraction(u, ratios):
+    """Zbiór (train/valid/test) dla u z [0, 1) przy udziałach procentowych `ratios`."""
+    total = sum(ratios) or 1
+    bound = 0.0
+    for subset, ratio in zip(SUBSETS, ratios):
+        bound += ratio / total
+        if u < bound:
+            return subset
+    return SUBSETS[-1]
+
+
+def assign_subset(group, ratios, seed=None):
+    """Zbiór grupy w trybie SPLIT_HASH – zależy tylko od (seed, klucz grupy) i udziałów."""
+    return subset_for_fraction(stable_fraction(group, seed or 0), ratios)
+
+
+def file_keys(folder, files, group_by=None):
+    """
+    Zwraca dwa słowniki: nazwa pliku -> klucz treści oraz nazwa pliku -> klucz grupy.
+
+    Klucz treści nie zależy od nazwy pliku (renumeracja jej nie zmienia):
+    skrót pobranych bajtów albo perceptual hash z indeksu duplikatów
+    folderu (validator.dedup_index). Indeks jest trwały, więc każdy obraz
+    jest dekodowany najwyżej raz – pliki już zindeksowane nie są czytane wcale.
+    """
+    index = get_dedup_index(folder)
+    entries = index.entries()
+
+    keys = {}
+    for name in files:
+        value, digest, _ = entries.get(name, (None, None, None))
+        if digest:
+            keys[name] = digest
+        elif value is not None:
+            keys[name] = f"{value:016x}"
+        else:
+            keys[name] = name
+
+    if group_by == GROUP_DUPLICATES:
+        clusters = index.clusters()
+        groups = {name: "dup:" + keys.get(clusters.get(name, name), name) for name in files}
+    elif group_by == GROUP_SOURCE:
+        groups = {
+            name: "src:" + (entries.get(name, (None, None, None))[2] or "nieznane") for name in files
+        }
+    else:
+        groups = dict(keys)
+
+    return keys, groups
+
+
+def extract_num(filename):
+    name, _ = os.path.splitext(filename)
+    return int(name) if name.isdigit() else 999999999
+
+
+def plan_split(folder, files, ratios, mode=SPLIT_RANDOM, seed=None, group_by=None):
+    """
+    Przydział plików do zbiorów: słownik train/valid/test -> lista nazw.
+
+    SPLIT_HASH – każda grupa trafia do zbioru wyznaczonego przez
+        stable_fraction(klucz grupy, seed); dodanie nowych plików nie
+        zmienia przydziału starych, a udziały zbliżają się do `ratios`.
+    SPLIT_RANDOM – grupy tasowane random.Random(seed) i dzielone według
+        udziałów (seed=None – inny podział przy każdym uruchomieniu).
+    SPLIT_PRIORITIZE – kolejność numerów plików, bez grupowania.
+
+    group_by (GROUP_DUPLICATES / GROUP_SOURCE) trzyma całe grupy w jednym
+    zbiorze, więc duplikaty nie trafiają jednocześnie do train i test.
+    Tryb hash działa w O(n) względem liczby plików (random i prioritize
+    dodatkowo sortują), a obrazy już zindeksowane nie są ponownie czytane.
+    """
+    plan = {subset: [] for subset in SUBSETS}
+
+    if mode == SPLIT_PRIORITIZE:
+        ordered = sorted(files, key=extract_num)
+        train_end = int((ratios[0] / 100) * len(ordered))
+        valid_end = train_end + int((ratios[1] / 100) * len(ordered))
+        plan["train"] = ordered[:train_end]
+        plan["valid"] = ordered[train_end:valid_end]
+        plan["test"] = ordered[valid_end:]
+        return plan
+
+    if mode == SPLIT_HASH or group_by:
+        _, groups = file_keys(folder, files, group_by)
+    else:
+        groups = {name: name for name in files}
+
+    members = {}
+    for name in files:
+        members.setdefault(groups[name], []).append(name)
+
+    if mode == SPLIT_HASH:
+        for group, names in members.items():
+            plan[assign_subset(group, ratios, seed)].extend(names)
+        return plan
+
+    # SPLIT_RANDOM: tasowanie grup, potem dzielenie według liczby plików
+    order = sorted(members)
+    random.Random(seed).shuffle(order)
+
+    total = len(files)
+    train_end = int((ratios[0] / 100) * total)
+    valid_end = train_end + int((ratios[1] / 100) * total)
+
+    assigned = 0
+    for group in order:
+        if assigned < train_end:
+            subset = "train"
+        elif assigned < valid_end:
+            subset = "valid"
+        else:
+            subset = "test"
+        plan[subset].extend(members[group])
+        assigned += len(members[group])
+    return plan
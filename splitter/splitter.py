@@ -1,48 +1,156 @@
 import os
-import shutil
-import random
 
-def split_images(src_folder, dst_folder, ratios, subsets, mode="random"):
-    train_ratio, valid_ratio, test_ratio = ratios
+from splitter.file_transfer import FileTransfer, TRANSFER_COPY, TRANSFER_MOVE, DEFAULT_COPY_WORKERS
+from splitter.split_manifest import SplitManifest
+from splitter.split_plan import plan_split, assign_subset, extract_num, file_keys, SPLIT_RANDOM
 
+
+def split_images(
+    src_folder,
+    dst_folder,
+    ratios,
+    subsets,
+    mode=SPLIT_RANDOM,
+    transfer=TRANSFER_COPY,
+    max_workers=DEFAULT_COPY_WORKERS,
+    progress_callback=None,
+    seed=None,
+    group_by=None,
+    incremental=False,
+):
+    """
+    Dzieli obrazy z `src_folder` na podfoldery `subsets` (train/valid/test)
+    w `dst_folder`. transfer – metoda przeniesienia plików (splitter.file_transfer):
+    copy, move, hardlink albo reflink; przy braku obsługi automatycznie copy.
+    Pliki przenoszone są równolegle (max_workers wątków);
+    progress_callback(zbiór, gotowe, wszystkie) raportuje postęp każdego zbioru.
+
+    mode (random / prioritize / hash), seed i group_by – patrz
+    splitter.split_plan.plan_split; ten sam seed daje ten sam podział,
+    a group_by trzyma duplikaty lub obrazy z jednego źródła w jednym zbiorze.
+
+    Pliki dostają kolejne wolne numery w `dst_folder`, a podział zapisywany
+    jest w manifeście (splitter.split_manifest) – także ten pełny, więc
+    można go później uzupełniać przyrostowo.
+
+    incremental=True dopisuje pliki do podziału już istniejącego w
+    `dst_folder` (patrz _split_incremental); `mode` jest wtedy ignorowany.
+    """
     # wczytujemy wszystkie pliki
     files = [
         f for f in os.listdir(src_folder)
         if f.lower().endswith((".jpg", ".jpeg", ".png", ".gif"))
     ]
 
-    # --- TRYB PRIORYTETOWY ---
-    if mode == "prioritize":
-        def extract_num(filename):
-            name, _ = os.path.splitext(filename)
-            return int(name) if name.isdigit() else 999999999
+    if incremental:
+        _split_incremental(
+            src_folder, dst_folder, files, ratios, subsets,
+            transfer, max_workers, progress_callback, seed, group_by,
+        )
+        return
 
-        files = sorted(files, key=extract_num)
+    plan = plan_split(src_folder, files, ratios, mode=mode, seed=seed, group_by=group_by)
 
-    # --- TRYB RANDOM ---
-    else:
-        random.shuffle(files)
+    # Tworzymy folder docelowy
+    for subset in subsets:
+        os.makedirs(os.path.join(dst_folder, subset), exist_ok=True)
 
-    total = len(files)
-    train_end = int((train_ratio / 100) * total)
-    valid_end = train_end + int((valid_ratio / 100) * total)
+    # manifest zapisywany także tu, żeby późniejszy podział przyrostowy znał
+    # klucze i grupy tych plików (pomijanie duplikatów, wyrównywanie udziałów)
+    manifest = SplitManifest(dst_folder)
+    keys, groups = file_keys(src_folder, files, group_by)
+    subset_of = {name: subset for subset in subsets if subset in plan for name in plan[subset]}
+    assigned = [(name, subset_of[name]) for name in sorted(subset_of, key=extract_num)]
+    jobs = _numbered_jobs(src_folder, dst_folder, assigned, keys, groups, manifest)
 
-    train_files = files[:train_end]
-    valid_files = files[train_end:valid_end]
-    test_files = files[valid_end:]
+    mover = FileTransfer(transfer, max_workers=max_workers)
+    try:
+        mover.transfer_all(jobs, progress_callback)
+    finally:
+        manifest.save()
+
+    print(f"[Podział] Pliki: {mover.counts}")
+
+
+def _numbered_jobs(src_folder, dst_folder, assigned, keys, groups, manifest):
+    """
+    Zadania transferu dla nowych plików: assigned to lista (nazwa, zbiór)
+    w kolejności numeracji. Pliki dostają kolejne wolne numery z manifestu
+    (wspólne dla wszystkich zbiorów, więc nic nie jest nadpisywane),
+    a ich klucz treści, grupa i zbiór są dopisywane do manifestu.
+    """
+    next_index = manifest.next_index()
+    jobs = []
+    for filename, subset in assigned:
+        key = keys[filename]
+        new_name = f"{next_index}{os.path.splitext(filename)[1]}"
+        next_index += 1
+        jobs.append((os.path.join(src_folder, filename), os.path.join(dst_folder, subset, new_name), subset))
+        # klucz równy nazwie = plik bez wpisu w indeksie, treść nieznana
+        manifest.set(new_name, None if key == filename else key, groups[filename], subset)
+    return jobs
+
+
+def _split_incremental(
+    src_folder, dst_folder, files, ratios, subsets,
+    transfer, max_workers, progress_callback, seed, group_by,
+):
+    """
+    Podział przyrostowy według manifestu (splitter.split_manifest) w `dst_folder`.
+
+    Nowe pliki dostają zbiór jak w trybie hash i kolejne wolne numery;
+    pliki o treści już obecnej w podziale są pomijane. Pliki rozdzielone
+    wcześniej są przenoszone tylko wtedy, gdy zmiana udziałów lub seed
+    zmieniła ich zbiór – przy tych samych ustawieniach operacji plikowych
+    jest tyle, ile nowych obrazów.
+    """
+    manifest = SplitManifest(dst_folder)
 
-    # Tworzymy folder docelowy
     for subset in subsets:
         os.makedirs(os.path.join(dst_folder, subset), exist_ok=True)
 
-    def copy_files(fs, subset):
-        subset_path = os.path.join(dst_folder, subset)
-        for filename in fs:
-            shutil.copy(os.path.join(src_folder, filename), os.path.join(subset_path, filename))
-
-    if "train" in subsets:
-        copy_files(train_files, "train")
-    if "valid" in subsets:
-        copy_files(valid_files, "valid")
-    if "test" in subsets:
-        copy_files(test_files, "test")
+    # pliki już rozdzielone, których przydział się zmienił
+    moves = []
+    for name, (key, group, subset) in manifest.entries().items():
+        if group is None:
+            continue    # przejęte z podziału bez manifestu – zostają na miejscu
+        target = assign_subset(group, ratios, seed)
+        if target != subset and target in subsets:
+            moves.append((
+                os.path.join(dst_folder, subset, name),
+                os.path.join(dst_folder, target, name),
+                target,
+            ))
+            manifest.set(name, key, group, target)
+
+    keys, groups = file_keys(src_folder, files, group_by)
+    known = manifest.keys()
+
+    assigned = []
+    skipped = 0
+    for filename in sorted(files, key=extract_num):
+        key = keys[filename]
+        # klucz równy nazwie = plik bez wpisu w indeksie, treść nieznana
+        if key != filename and key in known:
+            skipped += 1
+            continue
+        subset = assign_subset(groups[filename], ratios, seed)
+        if subset not in subsets:
+            continue
+        assigned.append((filename, subset))
+        known.add(key)
+    jobs = _numbered_jobs(src_folder, dst_folder, assigned, keys, groups, manifest)
+
+    mover = FileTransfer(transfer, max_workers=max_workers)
+    try:
+        # przeniesienia w obrębie folderu docelowego to zawsze zmiana nazwy
+        FileTransfer(TRANSFER_MOVE, max_workers=max_workers).transfer_all(moves)
+        mover.transfer_all(jobs, progress_callback)
+    finally:
+        # wpisy plików, których nie udało się przenieść, wypadną przy następnym wczytaniu
+        manifest.save()
+
+    print(
+        f"[Podział] Przyrostowo – nowe: {len(jobs)}, przeniesione między zbiorami: {len(moves)}, "
+        f"pominięte (już w zbiorze): {skipped}. Pliki: {mover.counts}"
+    )
@@ -37,3 +37,15 @@ def renumber_images(folder):
         temp_path = os.path.join(folder, temp_name)
         final_path = os.path.join(folder, final_name)
         os.rename(temp_path, final_path)
+
+
+def get_cache_dir(*parts):
+    """
+    Zwraca (i tworzy) katalog pamięci podręcznej aplikacji:
+    %LOCALAPPDATA%/ImageSetDownloader/... na Windows,
+    ~/.cache/ImageSetDownloader/... na Linux / macOS.
+    """
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, "ImageSetDownloader", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
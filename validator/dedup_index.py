@@ -0,0 +1,300 @@
+import hashlib
+import os
+import threading
+
+from PIL import Image
+
+DEFAULT_MAX_DISTANCE = 6          # maks. odległość Hamminga (z 64 bitów) uznawana za duplikat
+INDEX_FILENAME = ".phash_index.log"
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def dhash(img, hash_size=8):
+    """
+    Perceptual hash (dHash) obrazu PIL jako 64-bitowa liczba całkowita
+    (dla DecodedImage przekaż `pixels()`, żeby nie konwertować drugi raz).
+    Porównuje jasność sąsiednich pikseli w miniaturze (hash_size+1) x hash_size,
+    więc jest odporny na skalowanie, kompresję i drobne zmiany kolorów.
+    """
+    # najpierw zmniejszenie, potem konwersja – szarość liczona tylko dla 72 pikseli
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    small = img.resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR).convert("L")
+    pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def content_digest(data):
+    """Skrót SHA-256 surowych bajtów pliku – do wykrywania identycznych kopii."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Drzewo Burkharda-Kellera dla odległości Hamminga.
+    Wyszukiwanie sąsiadów w promieniu d przegląda tylko gałęzie
+    o odległości w przedziale [dist - d, dist + d], więc jest podliniowe.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value, payload=None):
+        self.size += 1
+        node = [value, payload, {}]
+        if self.root is None:
+            self.root = node
+            return
+
+        current = self.root
+        while True:
+            dist = hamming(value, current[0])
+            child = current[2].get(dist)
+            if child is None:
+                current[2][dist] = node
+                return
+            current = child
+
+    def find(self, value, max_distance):
+        """Zwraca payload pierwszego elementu w odległości <= max_distance albo None."""
+        if self.root is None:
+            return None
+
+        stack = [self.root]
+        while stack:
+            node_value, payload, children = stack.pop()
+            dist = hamming(value, node_value)
+            if dist <= max_distance:
+                return payload
+            for child_dist, child in children.items():
+                if dist - max_distance <= child_dist <= dist + max_distance:
+                    stack.append(child)
+        return None
+
+    def find_all(self, value, max_distance):
+        """Payloady wszystkich elementów w odległości <= max_distance."""
+        found = []
+        if self.root is None:
+            return found
+
+        stack = [self.root]
+        while stack:
+            node_value, payload, children = stack.pop()
+            dist = hamming(value, node_value)
+            if dist <= max_distance:
+                found.append(payload)
+            for child_dist, child in children.items():
+                if dist - max_distance <= child_dist <= dist + max_distance:
+                    stack.append(child)
+        return found
+
+
+def _signature(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class DedupIndex:
+    """
+    Przyrostowy indeks duplikatów obrazów zapisanych w jednym folderze
+    (np. _tmp_<klasa>). Dla każdego pliku pamięta perceptual hash oraz
+    (jeśli znany) skrót SHA-256 pobranych bajtów, z których powstał.
+    Trwały: każdy wpis dopisywany jest do pliku INDEX_FILENAME w tym
+    folderze, więc indeks przetrwa zmianę źródła i wznowienie pobierania.
+
+    max_distance=None wyłącza wyszukiwanie podobnych obrazów
+    (find_duplicate), ale nie identycznych kopii (find_exact).
+    """
+
+    def __init__(self, folder, max_distance=DEFAULT_MAX_DISTANCE):
+        self.folder = folder
+        self.max_distance = max_distance
+        self.log_path = os.path.join(folder, INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._entries = {}    # nazwa pliku -> (hash, skrót treści, źródło, rozmiar, mtime_ns)
+        self._tree = BKTree()
+        self._digests = {}    # skrót treści -> nazwa pliku
+        self._load()
+        self.refresh()
+
+    def _load(self):
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 5:
+                    # wpisy sprzed zapisywania źródła
+                    parts.insert(2, "-")
+                if len(parts) != 6:
+                    continue
+                value, digest, source, size, mtime, name = parts
+                digest = None if digest == "-" else digest
+                source = None if source == "-" else source
+                self._entries[name] = (int(value, 16), digest, source, int(size), int(mtime))
+
+    @staticmethod
+    def _log_line(name, value, digest, source, size, mtime):
+        return f"{value:016x}\t{digest or '-'}\t{source or '-'}\t{size}\t{mtime}\t{name}\n"
+
+    def _rewrite_log(self):
+        tmp_path = self.log_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for name, entry in self._entries.items():
+                f.write(self._log_line(name, *entry))
+        os.replace(tmp_path, self.log_path)
+
+    def refresh(self):
+        """
+        Uzgadnia indeks z zawartością folderu: usuwa wpisy plików skasowanych,
+        przenosi hashe plików tylko przemianowanych (renumeracja – ten sam
+        rozmiar i mtime), przelicza hashe plików zmienionych w miejscu
+        i liczy hashe nowych plików. Dla plików spoza
+        downloadera skrót pobranych bajtów jest nieznany.
+        """
+        with self._lock:
+            files = {
+                f for f in os.listdir(self.folder)
+                if f.lower().endswith((".jpg", ".jpeg", ".png", ".gif"))
+            }
+            changed = False
+
+            orphaned = {}
+            modified = {}
+            for name in list(self._entries):
+                value, digest, source, size, mtime = self._entries[name]
+                if name not in files:
+                    orphaned[(size, mtime)] = (value, digest, source)
+                elif _signature(os.path.join(self.folder, name)) != (size, mtime):
+                    # plik zmieniony w miejscu (np. przeskalowany) – hash do
+                    # przeliczenia, ale pochodzenie (skrót pobranych bajtów, źródło) zostaje
+                    modified[name] = (None, digest, source)
+                else:
+                    continue
+                del self._entries[name]
+                changed = True
+
+            for name in files - set(self._entries):
+                path = os.path.join(self.folder, name)
+                try:
+                    sig = _signature(path)
+                    value, digest, source = modified.get(name) or orphaned.get(sig, (None, None, None))
+                    if value is None:
+                        with Image.open(path) as img:
+                            value = dhash(img)
+                except Exception as e:
+                    print(f"[Duplikaty] Nie można zindeksować {name}: {e}")
+                    continue
+                self._entries[name] = (value, digest, source, sig[0], sig[1])
+                changed = True
+
+            if changed or not os.path.exists(self.log_path):
+                self._rewrite_log()
+
+            self._tree = BKTree()
+            self._digests = {}
+            for name, (value, digest, _, _, _) in self._entries.items():
+                self._tree.add(value, name)
+                if digest:
+                    self._digests[digest] = name
+
+    def find_duplicate(self, value):
+        """Nazwa pliku będącego (prawie) duplikatem hasha `value` albo None."""
+        if self.max_distance is None:
+            return None
+        with self._lock:
+            return self._tree.find(value, self.max_distance)
+
+    def find_exact(self, digest):
+        """Nazwa pliku zapisanego z identycznych bajtów (content_digest) albo None."""
+        with self._lock:
+            return self._digests.get(digest)
+
+    def entries(self):
+        """Kopia indeksu: nazwa pliku -> (hash, skrót treści albo None, źródło albo None)."""
+        with self._lock:
+            return {
+                name: (value, digest, source)
+                for name, (value, digest, source, _, _) in self._entries.items()
+            }
+
+    def similar(self, name, max_distance=None):
+        """Nazwy plików podobnych do pliku `name` (łącznie z nim samym)."""
+        if max_distance is None:
+            max_distance = self.max_distance if self.max_distance is not None else DEFAULT_MAX_DISTANCE
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return [name]
+            return self._tree.find_all(entry[0], max_distance)
+
+    def clusters(self, max_distance=None):
+        """
+        Grupy plików będących (prawie) duplikatami: nazwa pliku -> nazwa
+        reprezentanta grupy (najmniejsza nazwa w grupie). Łączenie przez
+        union-find po sąsiadach z drzewa BK – bez ponownego czytania obrazów.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance if self.max_distance is not None else DEFAULT_MAX_DISTANCE
+
+        with self._lock:
+            parent = {name: name for name in self._entries}
+
+            def root(name):
+                while parent[name] != name:
+                    parent[name] = parent[parent[name]]
+                    name = parent[name]
+                return name
+
+            for name, (value, _, _, _, _) in self._entries.items():
+                for other in self._tree.find_all(value, max_distance):
+                    a, b = root(name), root(other)
+                    if a != b:
+                        parent[max(a, b)] = min(a, b)
+
+            return {name: root(name) for name in parent}
+
+    def add(self, filename, value, digest=None, source=None):
+        """Rejestruje nowo zapisany plik (ścieżka lub nazwa w folderze indeksu)."""
+        name = os.path.basename(filename)
+        size, mtime = _signature(os.path.join(self.folder, name))
+        with self._lock:
+            self._entries[name] = (value, digest, source, size, mtime)
+            self._tree.add(value, name)
+            if digest:
+                self._digests[digest] = name
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(self._log_line(name, value, digest, source, size, mtime))
+
+
+def get_dedup_index(folder, max_distance=DEFAULT_MAX_DISTANCE):
+    """
+    Zwraca indeks duplikatów dla folderu (wspólny dla wszystkich downloaderów
+    piszących do tego folderu). Przy każdym wywołaniu indeks jest uzgadniany
+    z dyskiem, bo między pobraniami folder mógł zostać wyczyszczony ręcznie.
+    """
+    key = os.path.abspath(folder)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None or not os.path.exists(index.log_path):
+            index = DedupIndex(folder, max_distance)
+            _indexes[key] = index
+            return index
+
+    index.max_distance = max_distance
+    index.refresh()
+    return index
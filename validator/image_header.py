@@ -0,0 +1,152 @@
+import struct
+
+# markery SOF (Start Of Frame) niosące wymiary obrazu JPEG
+_JPEG_SOF_MARKERS = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF,
+}
+
+
+class ImageHeader:
+    """
+    Format i wymiary obrazu znane bez dekodowania pikseli
+    (odczytane z nagłówka pliku albo podane przez API źródła).
+
+    Ma te same pola co obraz PIL używane przez filtry w downloaderach
+    (format, size, width, height), więc może przejść przez te same
+    bloki filtrów zamiast obrazu.
+
+    exact=False oznacza, że wymiary są tylko górnym ograniczeniem
+    (np. API podaje rozmiar oryginału, a pobieramy mniejszą wersję) –
+    wtedy wolno na ich podstawie odrzucać wyłącznie za małe obrazy.
+    """
+
+    def __init__(self, format, width, height, exact=True):
+        self.format = format
+        self.width = int(width)
+        self.height = int(height)
+        self.exact = exact
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def __repr__(self):
+        return f"ImageHeader({self.format}, {self.width}x{self.height}, exact={self.exact})"
+
+
+def _sniff_jpeg(data):
+    i = 2
+    n = len(data)
+    while i + 4 <= n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+
+        # bajty wypełniające 0xFF i markery bez długości
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+
+        seg_len = struct.unpack(">H", data[i + 2:i + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if i + 9 > n:
+                return None
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return ImageHeader("JPEG", width, height)
+
+        i += 2 + seg_len
+    return None
+
+
+def sniff_image_header(data):
+    """
+    Odczytuje format i wymiary z początkowych bajtów pliku JPEG/PNG/GIF.
+    Zwraca ImageHeader albo None, jeśli format jest inny lub danych
+    jest jeszcze za mało (np. długi blok EXIF przed SOF w JPEG).
+    """
+    if data[:2] == b"\xff\xd8":
+        return _sniff_jpeg(data)
+
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        if len(data) < 24 or data[12:16] != b"IHDR":
+            return None
+        width, height = struct.unpack(">II", data[16:24])
+        return ImageHeader("PNG", width, height)
+
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        if len(data) < 10:
+            return None
+        width, height = struct.unpack("<HH", data[6:10])
+        return ImageHeader("GIF", width, height)
+
+    return None
+
+
+def format_from_mime(mime):
+    """'image/jpeg' -> 'JPEG' itd.; None dla nieobsługiwanych typów."""
+    if not mime:
+        return None
+    return {
+        "image/jpeg": "JPEG",
+        "image/jpg": "JPEG",
+        "image/png": "PNG",
+        "image/gif": "GIF",
+    }.get(mime.lower())
+
+
+def header_rejected(header, allowed_formats=None, resolution_filter=None, min_size=None):
+    """
+    Czy obraz o danym nagłówku zostałby odrzucony przez filtr formatu,
+    rozdzielczości lub minimalny rozmiar dla crop.
+
+    Sprawdza dokładnie te same warunki co bloki filtrów w downloaderach,
+    więc obraz odrzucony tutaj zostanie odrzucony (i policzony) również tam.
+    """
+    w, h = header.size
+
+    if header.format and allowed_formats:
+        ext = "jpg" if header.format == "JPEG" else header.format.lower()
+        if ext not in allowed_formats:
+            return True
+
+    if resolution_filter:
+        if resolution_filter.get("min_w") and w < resolution_filter["min_w"]:
+            return True
+        if resolution_filter.get("min_h") and h < resolution_filter["min_h"]:
+            return True
+        if header.exact:
+            if resolution_filter.get("max_w") and w > resolution_filter["max_w"]:
+                return True
+            if resolution_filter.get("max_h") and h > resolution_filter["max_h"]:
+                return True
+
+    if min_size:
+        mw, mh = min_size
+        if w < mw or h < mh:
+            return True
+
+    return False
+
+
+def make_header_filter(allowed_formats=None, resolution_filter=None, method="resize", min_size=None):
+    """
+    Buduje predykat header -> bool dla pobierania z wczesnym odrzucaniem.
+    Zwraca None, gdy żaden filtr nie zależy od nagłówka (nie ma czego sprawdzać).
+    """
+    crop_size = min_size if method == "crop" else None
+    if not (allowed_formats or resolution_filter or crop_size):
+        return None
+
+    def check(header):
+        return header_rejected(
+            header,
+            allowed_formats=allowed_formats,
+            resolution_filter=resolution_filter,
+            min_size=crop_size,
+        )
+
+    return check
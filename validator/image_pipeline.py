@@ -0,0 +1,111 @@
+from io import BytesIO
+
+from PIL import Image
+
+PREVIEW_SIZE = 128    # dłuższy bok podglądu do szybkiej analizy pikseli
+
+
+class DecodedImage:
+    """
+    Obraz przechodzący przez cały potok: walidacja -> (skalowanie/crop) -> zapis.
+
+    Piksele dekodowane są najwyżej raz (przy pierwszym użyciu, PIL robi to
+    leniwie), a konwersja do RGB wykonywana jest najwyżej raz i jej wynik
+    jest współdzielony przez walidator, hash duplikatów i zapis do JPEG.
+    Obrazy już w trybie RGB (większość JPEG) nie są kopiowane wcale.
+
+    Jeśli znane są surowe bajty pliku (`data`), preview() dla JPEG
+    dekoduje je w trybie draft (DCT w skali 1/2–1/8), bez pełnej
+    rozdzielczości – obraz odrzucony na podglądzie nie jest dekodowany wcale.
+    """
+
+    # tryby, na których walidator i hash mogą pracować bez konwersji
+    ANALYSIS_MODES = ("RGB", "L")
+
+    def __init__(self, img, data=None):
+        self.image = img
+        self.format = img.format
+        self._data = data
+        self._rgb = None
+        self._preview = None
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(Image.open(BytesIO(data)), data=data)
+
+    @property
+    def size(self):
+        return self.image.size
+
+    @property
+    def width(self):
+        return self.image.width
+
+    @property
+    def height(self):
+        return self.image.height
+
+    def rgb(self):
+        """Obraz w trybie RGB (konwersja przy pierwszym wywołaniu, potem z pamięci)."""
+        if self._rgb is None:
+            if self.image.mode == "RGB":
+                self.image.load()
+                self._rgb = self.image
+            else:
+                self._rgb = self.image.convert("RGB")
+        return self._rgb
+
+    def pixels(self):
+        """Obraz do analizy pikseli (walidacja, hash) – bez konwersji, jeśli nie jest potrzebna."""
+        if self._rgb is not None:
+            return self._rgb
+        if self.image.mode in self.ANALYSIS_MODES:
+            self.image.load()
+            return self.image
+        return self.rgb()
+
+    def preview(self, max_side=PREVIEW_SIZE):
+        """
+        Mała kopia RGB (dłuższy bok <= max_side) do statystyk pikseli.
+        Dla JPEG z bajtami – dekodowanie draft; dla pozostałych formatów
+        zmniejszany jest pełny obraz (zdekodowany raz, wykorzystany potem przy zapisie).
+        """
+        if self._preview is None:
+            if self.format == "JPEG" and self._data is not None and self._rgb is None:
+                img = Image.open(BytesIO(self._data))
+                img.draft("RGB", (max_side, max_side))
+            else:
+                img = self.pixels()
+
+            w, h = img.size
+            scale = max_side / max(w, h)
+            if scale < 1:
+                img = img.resize(
+                    (max(1, round(w * scale)), max(1, round(h * scale))),
+                    Image.Resampling.BOX,
+                )
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            self._preview = img
+        return self._preview
+
+    def save(self, path, save_fmt, transform=None):
+        """
+        Zapisuje obraz w formacie `save_fmt` (nazwa formatu PIL), opcjonalnie
+        po przekształceniu `transform(img) -> img` (np. skalowanie albo crop).
+        JPEG zawsze zapisywany jest jako RGB; jeśli obraz przekonwertowano
+        już wcześniej (np. w walidacji), używana jest ta sama kopia, a jeśli
+        nie – konwertowany jest dopiero wynik przekształcenia (mniej pikseli).
+        """
+        if save_fmt == "JPEG" and self._rgb is not None:
+            img = self._rgb
+        else:
+            img = self.image
+
+        if transform is not None:
+            img = transform(img)
+
+        if save_fmt == "JPEG" and img.mode != "RGB":
+            img = img.convert("RGB")
+
+        img.save(path, format=save_fmt)
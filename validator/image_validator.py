@@ -1,11 +1,98 @@
-def is_valid_image(img):
+import math
+
+try:
+    import numpy as np
+except ImportError:  # statystyki podglądu liczone wtedy histogramem PIL
+    np = None
+
+from validator.image_pipeline import DecodedImage
+
+VALIDATION_BASIC = "basic"      # odrzuca tylko obrazy całkowicie jednolite (pełna rozdzielczość)
+VALIDATION_STRICT = "strict"    # odrzuca też prawie puste placeholdery (na podglądzie)
+
+# progi trybu VALIDATION_STRICT (podgląd RGB, dłuższy bok PREVIEW_SIZE)
+MIN_CHANNEL_STD = 6.0           # największe odchylenie standardowe kanału
+MAX_DOMINANT_SHARE = 0.92       # udział najczęstszego koloru (kolory kwantyzowane do 4 bitów/kanał)
+MIN_ENTROPY = 1.5               # entropia histogramu jasności [bity]
+
+
+def is_uniform(img):
+    """Czy obraz PIL ma we wszystkich kanałach jedną wartość (np. cały czarny)."""
+    extrema = img.getextrema()
+    # obrazy jednokanałowe zwracają (min, max) zamiast listy par
+    if not isinstance(extrema[0], tuple):
+        extrema = (extrema,)
+    return all(channel[0] == channel[1] for channel in extrema)
+
+
+def _entropy(histogram, total):
+    return -sum(
+        (n / total) * math.log2(n / total) for n in histogram if n
+    )
+
+
+def preview_stats(preview):
+    """
+    Statystyki podglądu RGB: (maks. odchylenie std kanału,
+    udział dominującego koloru, entropia jasności w bitach).
+    """
+    if np is not None:
+        pixels = np.asarray(preview, dtype=np.uint8).reshape(-1, 3)
+        total = len(pixels)
+        std = float(pixels.std(axis=0).max())
+
+        q = (pixels >> 4).astype(np.uint16)
+        codes = (q[:, 0] << 8) | (q[:, 1] << 4) | q[:, 2]
+        dominant = int(np.bincount(codes, minlength=4096).max()) / total
+
+        luma = np.bincount(
+            (pixels @ np.array([299, 587, 114]) // 1000).astype(np.uint8), minlength=256
+        )
+        p = luma[luma > 0] / total
+        entropy = float(-(p * np.log2(p)).sum())
+        return std, dominant, entropy
+
+    # wersja bez NumPy – wolniejsza, ale na podglądzie wciąż tania
+    from PIL import ImageStat
+
+    total = preview.width * preview.height
+    std = max(ImageStat.Stat(preview).stddev)
+    quantized = preview.point(lambda v: v >> 4)
+    dominant = max(count for count, _ in quantized.getcolors(4096)) / total
+    entropy = _entropy(preview.convert("L").histogram(), total)
+    return std, dominant, entropy
+
+
+def is_near_blank(img):
+    """
+    Czy obraz jest prawie pusty (jednolite tło, placeholder
+    "image not available" itp.). Liczone na małym podglądzie,
+    dla JPEG bez dekodowania pełnej rozdzielczości.
+    """
+    std, dominant, entropy = preview_stats(img.preview())
+    return std < MIN_CHANNEL_STD or dominant > MAX_DOMINANT_SHARE or entropy < MIN_ENTROPY
+
+
+def is_valid_image(img, mode=VALIDATION_BASIC):
+    """
+    Sprawdza, czy obraz da się zdekodować i nie jest pusty.
+    `img` to DecodedImage (zalecane – piksele i konwersja RGB są potem
+    wykorzystane ponownie przy zapisie) albo obraz PIL.
+
+    mode:
+        VALIDATION_BASIC  – odrzuca obrazy całkowicie jednolite,
+        VALIDATION_STRICT – odrzuca też obrazy prawie puste (is_near_blank);
+                            szybsze, bo pracuje na podglądzie zamiast pełnego obrazu.
+    """
     try:
-        img = img.convert("RGB")
-        img.verify()
-        extrema = img.getextrema()
+        if not isinstance(img, DecodedImage):
+            img = DecodedImage(img)
+
+        if mode == VALIDATION_STRICT:
+            return not is_near_blank(img)
 
         # odrzuć całkowicie jednolite obrazy
-        if all(channel[0] == channel[1] for channel in extrema):
+        if is_uniform(img.pixels()):
             return False
         return True
     except Exception as e:
@@ -0,0 +1,336 @@
+import threading
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from validator.image_header import ImageHeader
+from validator.image_pipeline import DecodedImage
+from validator.image_validator import is_valid_image, VALIDATION_BASIC
+from validator.dedup_index import content_digest, dhash
+from downloader.fetch_pool import SkippedBody
+from exceptions.exceptions import (
+    TooManyFormatFilteredException,
+    TooManyResolutionFilteredException,
+    TooManyFilesizeFilteredException,
+    SourceExhaustedException,
+)
+
+# domyślna kolejność: od reguł tanich (rozmiar, bajty, nagłówek)
+# do drogich (dekodowanie pikseli, perceptual hash)
+DEFAULT_RULE_ORDER = (
+    "filesize",
+    "exact_duplicate",
+    "format",
+    "resolution",
+    "crop_size",
+    "blank",
+    "near_duplicate",
+)
+
+# grupy liczników odrzuceń -> wyjątek, gdy źródło nic jeszcze nie dało
+_GROUP_EXCEPTIONS = {
+    "filesize": TooManyFilesizeFilteredException,
+    "format": TooManyFormatFilteredException,
+    "resolution": TooManyResolutionFilteredException,
+}
+
+_EXT_BY_FORMAT = {"JPEG": "jpg", "JPG": "jpg", "PNG": "png", "GIF": "gif"}
+
+# statystyki reguł zsumowane ze wszystkich łańcuchów (całe zadanie, wszystkie źródła)
+_totals = {}
+_totals_lock = threading.Lock()
+
+# funkcje (źródło, powód) wywoływane przy każdym odrzuceniu – np. licznik w GUI
+_rejection_listeners = []
+
+
+class Candidate:
+    """
+    Jeden obraz sprawdzany przez ValidationChain.
+
+    `raw` to wynik pobierania: bajty pliku albo zastępnik z wczesnego
+    odrzucania (ImageHeader / SkippedBody). Kosztowne pola (otwarcie
+    obrazu, dekodowanie, skróty) liczone są leniwie i tylko raz, przez
+    pierwszą regułę, która ich potrzebuje – tam też liczy się ich czas.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.has_body = not isinstance(raw, (ImageHeader, SkippedBody))
+        self._image = raw if isinstance(raw, ImageHeader) else None
+        self._decoded = None
+        self._digest = None
+        self._image_hash = None
+
+    @property
+    def image(self):
+        """Obraz PIL (otwarty bez dekodowania pikseli) albo ImageHeader; None dla SkippedBody."""
+        if self._image is None and self.has_body:
+            self._image = Image.open(BytesIO(self.raw))
+        return self._image
+
+    @property
+    def ext(self):
+        image = self.image
+        if image is None or not image.format:
+            return None
+        return _EXT_BY_FORMAT.get(image.format.upper())
+
+    @property
+    def decoded(self):
+        if self._decoded is None:
+            self._decoded = DecodedImage(self.image, data=self.raw)
+        return self._decoded
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            self._digest = content_digest(self.raw)
+        return self._digest
+
+    @property
+    def image_hash(self):
+        if self._image_hash is None:
+            self._image_hash = dhash(self.decoded.pixels())
+        return self._image_hash
+
+
+class RuleStats:
+    def __init__(self):
+        self.checked = 0
+        self.rejected = 0
+        self.seconds = 0.0
+
+    def add(self, rejected, seconds):
+        self.checked += 1
+        self.rejected += int(rejected)
+        self.seconds += seconds
+
+
+# ----------------------------
+# REGUŁY
+# Każda reguła zwraca None (obraz przechodzi) albo parę (powód, grupa);
+# grupa None = odrzucenie niewliczane do limitów błędów źródła.
+# ----------------------------
+
+def _rule_filesize(chain, c):
+    if not chain.filesize_filter or isinstance(c.raw, ImageHeader):
+        return None
+    size_mb = len(c.raw) / (1024 * 1024)
+    min_mb = chain.filesize_filter.get("min_mb")
+    max_mb = chain.filesize_filter.get("max_mb")
+    if min_mb is not None and size_mb < min_mb:
+        return "filtr minimalnej wagi pliku", "filesize"
+    if max_mb is not None and size_mb > max_mb:
+        return "filtr maksymalnej wagi pliku", "filesize"
+    return None
+
+
+def _rule_exact_duplicate(chain, c):
+    if chain.dedup_index is not None and chain.dedup_index.find_exact(c.digest) is not None:
+        return "identyczna kopia", None
+    return None
+
+
+def _rule_format(chain, c):
+    if c.image is None:
+        return None
+    ext = c.ext
+    if not ext and c.has_body:
+        return "nieobsługiwany format", None
+    if chain.allowed_formats and ext and ext not in chain.allowed_formats:
+        return "filtr formatu", "format"
+    return None
+
+
+def _rule_resolution(chain, c):
+    rf = chain.resolution_filter
+    if not rf or c.image is None:
+        return None
+    w, h = c.image.size
+    if rf.get("min_w") and w < rf["min_w"]:
+        return "za wąskie", "resolution"
+    if rf.get("min_h") and h < rf["min_h"]:
+        return "za niskie", "resolution"
+    if rf.get("max_w") and w > rf["max_w"]:
+        return "za szerokie", "resolution"
+    if rf.get("max_h") and h > rf["max_h"]:
+        return "za wysokie", "resolution"
+    return None
+
+
+def _rule_crop_size(chain, c):
+    if not chain.crop_size or c.image is None:
+        return None
+    mw, mh = chain.crop_size
+    if c.image.width < mw or c.image.height < mh:
+        return "za małe obrazy dla crop", "resolution"
+    return None
+
+
+def _rule_blank(chain, c):
+    if not is_valid_image(c.decoded, chain.validation_mode):
+        return "pusty lub uszkodzony obraz", None
+    return None
+
+
+def _rule_near_duplicate(chain, c):
+    if chain.dedup_index is not None and chain.dedup_index.find_duplicate(c.image_hash) is not None:
+        return "duplikat", None
+    return None
+
+
+RULES = {
+    "filesize": _rule_filesize,
+    "exact_duplicate": _rule_exact_duplicate,
+    "format": _rule_format,
+    "resolution": _rule_resolution,
+    "crop_size": _rule_crop_size,
+    "blank": _rule_blank,
+    "near_duplicate": _rule_near_duplicate,
+}
+
+# reguły wymagające pełnej treści – pomijane dla zastępników z wczesnego odrzucania
+_BODY_RULES = {"exact_duplicate", "blank", "near_duplicate"}
+
+
+class ValidationChain:
+    """
+    Uporządkowany łańcuch reguł walidacji obrazów jednego downloadera.
+
+    Reguły wykonywane są w kolejności `order` (nazwy z RULES) aż do
+    pierwszego odrzucenia. Dla każdej reguły zliczane są sprawdzenia,
+    odrzucenia i czas – w `stats` łańcucha oraz w sumach dla całego
+    zadania (get_validation_stats / report_validation_stats).
+
+    Odrzucenia z grup filesize/format/resolution liczą się do limitów
+    `max_errors` źródła: po ich przekroczeniu rzucany jest
+    SourceExhaustedException (gdy coś już pobrano) albo odpowiedni
+    TooMany...FilteredException (gdy nie pobrano nic). Reguły z `fail_fast`
+    rzucają TooMany... od razu, jeśli źródło nie dało jeszcze żadnego obrazu.
+    """
+
+    def __init__(
+        self,
+        source_name,
+        order=None,
+        max_errors=None,
+        fail_fast=(),
+        allowed_formats=None,
+        resolution_filter=None,
+        crop_size=None,
+        filesize_filter=None,
+        validation_mode=VALIDATION_BASIC,
+        dedup_index=None,
+    ):
+        self.source_name = source_name
+        self.order = tuple(order or DEFAULT_RULE_ORDER)
+        unknown = [name for name in self.order if name not in RULES]
+        if unknown:
+            raise ValueError(f"Nieznane reguły walidacji: {', '.join(unknown)}")
+
+        self.max_errors = max_errors or {}
+        self.fail_fast = set(fail_fast)
+        self.allowed_formats = allowed_formats
+        self.resolution_filter = resolution_filter
+        self.crop_size = crop_size
+        self.filesize_filter = filesize_filter
+        self.validation_mode = validation_mode
+        self.dedup_index = dedup_index
+
+        self.errors = {group: 0 for group in _GROUP_EXCEPTIONS}
+        self.stats = {name: RuleStats() for name in self.order}
+
+    def check(self, candidate, downloaded):
+        """
+        Przepuszcza obraz przez reguły; zwraca powód odrzucenia albo None.
+        `downloaded` – liczba obrazów zapisanych dotąd z tego źródła.
+        """
+        for name in self.order:
+            if name in _BODY_RULES and not candidate.has_body:
+                continue
+
+            result = None
+            start = time.perf_counter()
+            try:
+                result = RULES[name](self, candidate)
+            finally:
+                self._record(name, result is not None, time.perf_counter() - start)
+
+            if result is None:
+                continue
+
+            reason, group = result
+            self._notify_rejection(reason)
+            if group is not None:
+                self._count_error(name, group, reason, downloaded)
+            return reason
+
+        # zastępnik (obraz odrzucony w trakcie pobierania) nigdy nie jest zapisywany
+        if not candidate.has_body:
+            reason = "odrzucony przed pobraniem całości"
+            self._notify_rejection(reason)
+            return reason
+        return None
+
+    def _count_error(self, name, group, reason, downloaded):
+        self.errors[group] += 1
+        limit_reached = self.errors[group] >= self.max_errors.get(group, float("inf"))
+
+        if downloaded > 0 and limit_reached:
+            raise SourceExhaustedException(f"{self.source_name}: wyczerpane ({reason}).")
+        if downloaded == 0 and (limit_reached or name in self.fail_fast):
+            raise _GROUP_EXCEPTIONS[group](f"{self.source_name}: zbyt restrykcyjny filtr ({reason}).")
+
+    def _notify_rejection(self, reason):
+        for listener in list(_rejection_listeners):
+            listener(self.source_name, reason)
+
+    def _record(self, name, rejected, seconds):
+        self.stats[name].add(rejected, seconds)
+        with _totals_lock:
+            _totals.setdefault(name, RuleStats()).add(rejected, seconds)
+
+
+def get_validation_stats():
+    """
+    Zwraca słownik: nazwa reguły -> {"checked", "rejected", "seconds"}
+    zsumowany od ostatniego reset_validation_stats().
+    """
+    with _totals_lock:
+        return {
+            name: {"checked": st.checked, "rejected": st.rejected, "seconds": st.seconds}
+            for name, st in _totals.items()
+        }
+
+
+def report_validation_stats():
+    """Wypisuje statystyki reguł (sprawdzenia, odrzucenia, czas) na koniec zadania."""
+    stats = get_validation_stats()
+    if not stats:
+        return
+    print("[Walidacja] Statystyki reguł:")
+    for name, st in stats.items():
+        print(
+            f"[Walidacja]   {name:<16} sprawdzono: {st['checked']:>5}  "
+            f"odrzucono: {st['rejected']:>5}  czas: {st['seconds'] * 1000:>8.1f} ms"
+        )
+
+
+def add_rejection_listener(listener):
+    """
+    Rejestruje listener(źródło, powód) wywoływany z wątku pobierania
+    przy każdym odrzuconym obrazie – musi być szybki i bezpieczny wątkowo.
+    """
+    _rejection_listeners.append(listener)
+
+
+def remove_rejection_listener(listener):
+    if listener in _rejection_listeners:
+        _rejection_listeners.remove(listener)
+
+
+def reset_validation_stats():
+    with _totals_lock:
+        _totals.clear()